@@ -1,22 +1,86 @@
-import subprocess
+# This script runs the processing scripts, in parallel where they do not
+# depend on each other's output files, and stops as soon as one of them fails.
+# Scripts whose code and input files did not change since their last
+# successful run are skipped (use --force to rerun them anyway).
+# With --in-process, all scripts run one after the other in this interpreter and
+# hand their intermediate files over in memory.
+# Figures are rendered separately by A20 from the saved files (skip it with
+# --no-plots)
+# The timings, peak memory and row counts of the run are saved to
+# data/processing/.pipeline_report.json, with their changes since the last run
 
-scripts_to_run = [
-    "A01_combine_GEOMAR_CTD_data_and_nuts.py",
-    "A02_process_VINDTA_TA_DIC.py",
-    "A03_correct_VINDTA_DIC_drift.py",
-    "A04_match_TA_only_samples_with_SMB_sal_temp.py",
-    "A05_process_VINDTA_TA_only.py",
-    "A06_combine_TA_DIC_only_subsamples.py",
-    "A07_uws_match_pyroscience_smb.py",
-    "A08_uws_remove_bad_pH.py",
-    "A09_uws_estimate_alkalinity.py",
-    "A10_uws_correct_pH.py",
-    "A11_combine_all_CTD_TA_DIC_discrete_samples.py",
-    "A12_format_discrete_samples.py",
-    "A13_format_underway_discrete_samples.py",
-    "A14_format_underway_pH.py",
-]
+import argparse, sys
+from processing_scripts.pipeline import (
+    run_pipeline,
+    StageError,
+    DEFAULT_STAGES,
+    PLOT_STAGES,
+    REPORT_FILE,
+)
 
-for script in scripts_to_run:
-    print("Running {}".format(script))
-    subprocess.call(["python", script])
+parser = argparse.ArgumentParser(description="Run the SO289 processing pipeline.")
+parser.add_argument(
+    "stages",
+    nargs="*",
+    default=DEFAULT_STAGES,
+    help="stages to run, e.g. A07 A08 (default: {})".format(" ".join(DEFAULT_STAGES)),
+)
+parser.add_argument(
+    "-j", "--jobs", type=int, default=None, help="maximum number of parallel stages"
+)
+parser.add_argument(
+    "--pool-workers",
+    type=int,
+    default=None,
+    help="maximum number of processes each stage may pool, e.g. to read the "
+    "optode files (default: one per CPU)",
+)
+parser.add_argument(
+    "--force", action="store_true", help="rerun stages even if they are up to date"
+)
+parser.add_argument(
+    "--in-process",
+    action="store_true",
+    help="run all stages in this interpreter, passing intermediates in memory",
+)
+parser.add_argument(
+    "--write-intermediates",
+    action="store_true",
+    help="with --in-process, also write the intermediate files to data/processing",
+)
+parser.add_argument(
+    "--format",
+    choices=["csv", "parquet", "feather"],
+    default=None,
+    help="file format of the intermediates in data/processing (default: csv)",
+)
+parser.add_argument(
+    "--no-plots",
+    action="store_true",
+    help="do not render figures (skip stages {})".format(" ".join(PLOT_STAGES)),
+)
+parser.add_argument(
+    "--no-report",
+    action="store_true",
+    help="do not save the performance report to {}".format(REPORT_FILE),
+)
+args = parser.parse_args()
+
+stages = args.stages
+if args.no_plots:
+    stages = [name for name in stages if name not in PLOT_STAGES]
+
+try:
+    run_pipeline(
+        stages,
+        max_workers=args.jobs,
+        force=args.force,
+        in_process=args.in_process,
+        write_intermediates=args.write_intermediates,
+        intermediate_format=args.format,
+        report_file=None if args.no_report else REPORT_FILE,
+        pool_workers=args.pool_workers,
+    )
+except StageError as error:
+    print("ERROR: {}".format(error))
+    sys.exit(1)
@@ -5,6 +5,7 @@ import numpy as np, pandas as pd, koolstof as ks, calkulate as calk
 from koolstof import vindta as ksv
 from pandas.tseries.offsets import DateOffset
 import matplotlib.dates as mdates
+import processing_scripts as ps
 
 # Import logfile and dbs file
 logfile = ksv.read_logfile("data/vindta/TA_DIC/logfile.bak", methods="3C standard")
@@ -99,7 +100,9 @@ for b in crm_batches:
         dbs.loc[L, "total_ammonium"] = 0  # micromol/kg-sw
 
 # Assign metadata values for SO289 cruise samples
-so289_metadata = pd.read_csv("data/processing/A01_combine_GEOMAR_CTD_data_and_nuts.csv")
+so289_metadata = ps.read_intermediate(
+    "data/processing/A01_combine_GEOMAR_CTD_data_and_nuts.csv"
+)
 so289_metadata["bottle"] = ["SO289-" + str(s) for s in so289_metadata["bottle"]]
 so289_samples = list(so289_metadata["bottle"])
 
@@ -397,4 +400,4 @@ L = dbs["bottle"].str.startswith("64PE503")
 dbs = dbs[~L]
 
 # Save to .csv
-dbs.to_csv("data/processing/vindta/A02_process_SO289.csv", index=False)
+ps.write_intermediate(dbs, "data/processing/vindta/A02_process_SO289.csv", index=False)
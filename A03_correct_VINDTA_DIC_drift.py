@@ -4,11 +4,10 @@
 
 import pandas as pd
 from scipy.interpolate import PchipInterpolator
-from matplotlib import pyplot as plt
-import matplotlib.dates as mdates
+import processing_scripts as ps
 
 # Import dataframe
-df = pd.read_csv("data/processing/vindta/A02_process_SO289.csv")
+df = ps.read_intermediate("data/processing/vindta/A02_process_SO289.csv")
 
 # Only keep flag = 2
 L = df["flag"] == 2
@@ -81,85 +80,14 @@ SO289 = df[
 ]
 
 # Save to .csv
-SO289.to_csv("data/processing/vindta/SO289_CTD_TA_DIC_results.csv", index=False)
-
-# === PLOT
-# Create a column with hours and minutes
-df["analysis_datetime"] = pd.to_datetime(df["analysis_datetime"])
-df["datetime_for_plotting_only"] = df["analysis_datetime"].dt.strftime("%H:%M")
-df["datetime_for_plotting_only"] = pd.to_datetime(df["datetime_for_plotting_only"])
-
-for d in analysis_days:
-    # Create figure
-    fig, ax = plt.subplots(dpi=300, figsize=(6, 4))
-
-    L = df["dic_cell_id"] == d
-
-    # Scatter original DIC
-    ax.scatter(
-        x="datetime_for_plotting_only", y="dic", data=df[L], alpha=0.3, label="Initial"
-    )
-
-    # Scatter corrected DIC
-    ax.scatter(
-        x="datetime_for_plotting_only",
-        y="dic_corrected",
-        data=df[L],
-        alpha=0.3,
-        label="Corrected",
-    )
-
-    # Improve plot
-    myFmt = mdates.DateFormatter("%H")
-    ax.xaxis.set_major_formatter(myFmt)
-
-    ax.grid(alpha=0.3)
-    ax.set_xlabel("Time / hrs")
-    ax.set_ylabel("$DIC$ / μmol · $kg^{-1}$")
-
-    ax.set_title(d)
-
-    ax.legend()
-
-    # Save plot
-    plt.tight_layout()
-    plt.savefig("./figs/vindta/drift_correction/correct_DIC_drift_{}.png".format(d))
-
-# ==== PLOT ALL SAMPLES
-# Create a column with hours and minutes
-df["analysis_datetime"] = pd.to_datetime(df["analysis_datetime"])
-df["datetime_for_plotting_only"] = df["analysis_datetime"].dt.strftime("%H:%M")
-df["datetime_for_plotting_only"] = pd.to_datetime(df["datetime_for_plotting_only"])
-
-# Create figure
-fig, ax = plt.subplots(dpi=300, figsize=(6, 4))
-
-L = df["dic_corrected"].notnull()
-
-# Scatter original DIC
-ax.scatter(
-    x="datetime_for_plotting_only", y="dic", data=df[L], alpha=0.3, label="Initial"
+ps.write_intermediate(
+    SO289, "data/processing/vindta/SO289_CTD_TA_DIC_results.csv", index=False
 )
 
-# Scatter corrected DIC
-ax.scatter(
-    x="datetime_for_plotting_only",
-    y="dic_corrected",
-    data=df[L],
-    alpha=0.3,
-    label="Corrected",
+# Save the DIC correction of each analysis day for plotting (see A20)
+L = df["dic_cell_id"].isin(analysis_days)
+ps.write_intermediate(
+    df.loc[L, ["bottle", "dic_cell_id", "analysis_datetime", "dic", "dic_corrected"]],
+    "data/processing/vindta/A03_correct_VINDTA_DIC_drift.csv",
+    index=False,
 )
-
-# Improve plot
-myFmt = mdates.DateFormatter("%H")
-ax.xaxis.set_major_formatter(myFmt)
-
-ax.grid(alpha=0.3)
-ax.set_xlabel("Time / hrs")
-ax.set_ylabel("$DIC$ / μmol · $kg^{-1}$")
-
-ax.legend()
-
-# Save plot
-plt.tight_layout()
-plt.savefig("./figs/vindta/drift_correction/correct_DIC_drift_all.png")
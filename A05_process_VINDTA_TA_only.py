@@ -2,6 +2,7 @@
 
 import pandas as pd, numpy as np, koolstof as ks, calkulate as calk
 import matplotlib.dates as mdates
+import processing_scripts as ps
 
 # Import logfile and dbs file
 logfile = ks.read_logfile(
@@ -56,7 +57,9 @@ for b in crm_batches:
         dbs.loc[L, "total_ammonium"] = 0  # micromol/kg-sw
 
 # Assign metadata values for SO289 bottle samples
-so289_metadata = pd.read_csv("data/processing/A01_combine_GEOMAR_CTD_data_and_nuts.csv")
+so289_metadata = ps.read_intermediate(
+    "data/processing/A01_combine_GEOMAR_CTD_data_and_nuts.csv"
+)
 so289_metadata["bottle"] = ["SO289-" + str(s) for s in so289_metadata["bottle"]]
 so289_samples = list(so289_metadata["bottle"])
 
@@ -72,7 +75,7 @@ for s in so289_samples:
     ].values
 
 # Assign metadata for SO289/ UWS samples
-so289_metadata_uws = pd.read_csv(
+so289_metadata_uws = ps.read_intermediate(
     "data/processing/vindta/A04_match_TA_only_samples_with_SMB_sal_temp.csv"
 )
 so289_samples_uws = list(so289_metadata_uws["bottle"])
@@ -249,8 +252,12 @@ TA_exp = TA_exp[
 ]
 
 # Save to .csv
-SO289.to_csv("data/processing/vindta/SO289_CTD_TA_only_results.csv", index=False)
-SO289_UWS.to_csv(
-    "data/processing/vindta/A05_SO289_UWS_TA_only_results.csv", index=False
+ps.write_intermediate(
+    SO289, "data/processing/vindta/SO289_CTD_TA_only_results.csv", index=False
+)
+ps.write_intermediate(
+    SO289_UWS, "data/processing/vindta/A05_SO289_UWS_TA_only_results.csv", index=False
+)
+ps.write_intermediate(
+    TA_exp, "data/processing/vindta/SO289_TA_exp_TA_only_results.csv", index=False
 )
-TA_exp.to_csv("data/processing/vindta/SO289_TA_exp_TA_only_results.csv", index=False)
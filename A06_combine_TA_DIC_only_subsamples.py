@@ -4,10 +4,11 @@
 import pandas as pd
 import calkulate as calk
 import PyCO2SYS as pyco2
+import processing_scripts as ps
 
 # === ALKALINITY SAMPLES
 # Import CTD data post-R2CO2 processing
-TALK = pd.read_csv("data/processing/vindta/A05_SO289_UWS_TA_only_results.csv")
+TALK = ps.read_intermediate("data/processing/vindta/A05_SO289_UWS_TA_only_results.csv")
 
 # Only keep data for SO289
 L = TALK["bottle"].str.startswith("SO289")
@@ -27,7 +28,7 @@ TALK = TALK[
 ]
 
 # Reimport datetime column
-TALK_meta = pd.read_csv(
+TALK_meta = ps.read_intermediate(
     "data/processing/vindta/A04_match_TA_only_samples_with_SMB_sal_temp.csv"
 )
 
@@ -54,13 +55,10 @@ DIC["date_time"] = pd.to_datetime(DIC["date_time"], format="%d/%m/%y %H:%M")
 df["date_time"] = pd.to_datetime(df["date_time"])
 
 # Sort df
-df = df.sort_values(["date_time"])
-DIC = DIC.sort_values(["date_time"])
+df = df.sort_values(["date_time"]).reset_index(drop=True)
 
 # Add DIC back to df
-df = pd.merge_asof(
-    df, DIC, on="date_time", direction="nearest", tolerance=pd.Timedelta(minutes=5)
-)
+df["DIC"] = ps.match_nearest(df, DIC, ["DIC"], pd.Timedelta(minutes=5))["DIC"]
 
 # === CLEAN UP FINAL DF
 df = df[
@@ -97,4 +95,6 @@ df["pH_total_est_TA_DIC"] = pyco2.sys(
 )["pH_total"]
 
 # Save to .csv
-df.to_csv("data/processing/vindta/SO289_underway_TA_DIC_only_results.csv", index=False)
+ps.write_intermediate(
+    df, "data/processing/vindta/SO289_underway_TA_DIC_only_results.csv", index=False
+)
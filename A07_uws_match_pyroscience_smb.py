@@ -4,12 +4,18 @@
 
 import processing_scripts as ps
 
-# Import raw continuous optode measurements (optional: process it // time-consuming)
-df = ps.raw_process(
-    "data/underway/SO289_UWS_continuous_file_list.xlsx",
-    "data/underway/pH",
-    "data/underway/SMB/SMB_data_galley.dat",
-)
+# The Pyroscience files are read in a pool of processes when run by A00, which
+# must not run this script again as they start
+if __name__ == "__main__":
+    # Import raw continuous optode measurements (optional: process it // time-consuming)
+    df = ps.raw_process(
+        "data/underway/SO289_UWS_continuous_file_list.xlsx",
+        "data/underway/pH",
+        "data/underway/SMB/SMB_data_galley.dat",
+        max_workers=ps.get_pool_workers(),
+    )
 
-# Save pre BGC processing data
-df.to_csv("./data/processing/optode/A07_uws_match_pyroscience_smb.csv", index=False)
+    # Save pre BGC processing data
+    ps.write_intermediate(
+        df, "./data/processing/optode/A07_uws_match_pyroscience_smb.csv", index=False
+    )
@@ -4,11 +4,16 @@
 import pandas as pd
 import processing_scripts as ps
 
-# Load pre-processed dataframe including both Pyroscience and SMB data
-df = pd.read_csv("./data/processing/optode/A08_remove_bad_pH.csv")
+# PyCO2SYS runs in a pool of processes when run by A00, which must not run this
+# script again as they start
+if __name__ == "__main__":
+    # Load pre-processed dataframe including both Pyroscience and SMB data
+    df = ps.read_intermediate("./data/processing/optode/A08_remove_bad_pH.csv")
 
-# Estimate alkalinity
-df = ps.bgc_process(df)
+    # Estimate alkalinity
+    df = ps.bgc_process(df, max_workers=ps.get_pool_workers())
 
-# Save df
-df.to_csv("./data/processing/optode/A09_estimate_alkalinity.csv", index=False)
+    # Save df
+    ps.write_intermediate(
+        df, "./data/processing/optode/A09_estimate_alkalinity.csv", index=False
+    )
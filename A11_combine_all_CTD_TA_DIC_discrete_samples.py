@@ -1,12 +1,13 @@
 # This script combines all discrete samples
 
 import pandas as pd
+import processing_scripts as ps
 
 # Load results from lab analysis for TA and DIC
-ta_dic = pd.read_csv("data/processing/vindta/SO289_CTD_TA_DIC_results.csv")
+ta_dic = ps.read_intermediate("data/processing/vindta/SO289_CTD_TA_DIC_results.csv")
 
 # Load CTD data
-ctd = pd.read_csv("data/processing/A01_combine_GEOMAR_CTD_data_and_nuts.csv")
+ctd = ps.read_intermediate("data/processing/A01_combine_GEOMAR_CTD_data_and_nuts.csv")
 
 # Only keep SO289 samples
 L = ta_dic.bottle.str.startswith("SO289")
@@ -28,7 +29,7 @@ ta_dic = ta_dic[["bottle", "alkalinity", "dic_corrected"]]
 ctd = ctd.merge(ta_dic, on="bottle", how="outer")
 
 # === TA ONLY - Load results from lab analysis for TA only
-ta = pd.read_csv("data/processing/vindta/SO289_CTD_TA_only_results.csv")
+ta = ps.read_intermediate("data/processing/vindta/SO289_CTD_TA_only_results.csv")
 
 # Only keep SO289 samples
 L = ta.bottle.str.startswith("SO289")
@@ -84,4 +85,6 @@ dic = dic.rename(columns={"DIC": "DIC_only"})
 ctd = ctd.merge(dic, on="bottle", how="outer")
 
 # Save as .csv
-ctd.to_csv("data/processing/vindta/SO289_CTD_data_TA_DIC_combined.csv", index=False)
+ps.write_intermediate(
+    ctd, "data/processing/vindta/SO289_CTD_data_TA_DIC_combined.csv", index=False
+)
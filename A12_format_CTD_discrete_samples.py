@@ -1,9 +1,10 @@
 import pandas as pd
 import calkulate as calk
 from datetime import datetime
+import processing_scripts as ps
 
 # Load CTD data
-df = pd.read_csv("data/processing/SO289_CTD_data_TA_DIC_combined.csv")
+df = ps.read_intermediate("data/processing/vindta/SO289_CTD_data_TA_DIC_combined.csv")
 
 # Remove rows with no CTD info
 df = df.dropna(how="any", subset=["station"])
@@ -1,10 +1,10 @@
 import pandas as pd
-import re
 from datetime import datetime
+import processing_scripts as ps
 
 # Load discrete samples data
 # df = pd.read_csv("data/processing/vindta/SO289_underway_TA_DIC_only_results.csv")
-df = pd.read_csv("data/processing/vindta/SO289_underway_TA_DIC_only_results_with_uncertainty.csv")
+df = ps.read_intermediate("data/processing/vindta/SO289_underway_TA_DIC_only_results_with_uncertainty.csv")
 
 # Convert to datetime object
 df["date_time"] = pd.to_datetime(df["date_time"])
@@ -18,23 +18,9 @@ df["Time_UTC"] = df["date_time"].dt.time
 # Add depth column
 df["Depth"] = 3
 
-# Convert latitude and longitude
-df["lat"] = df["lat"].apply(lambda x: "".join(filter(None, x.split(" "))))
-df["lon"] = df["lon"].apply(lambda x: "".join(filter(None, x.split(" "))))
-
-
-def dms_to_dd(lat_or_lon):
-    """Convert coordinates from degrees to decimals."""
-    deg, minutes, seconds, direction = re.split("[°\.'\"]", lat_or_lon)
-    ans = ((float(deg) + float(minutes) / 60) + float(seconds) / (60 * 60)) * (
-        -1 if direction in ["W", "S"] else 1
-    )
-    return pd.Series({"decimals": ans})
-
-
 # convert lat/lon to decimals
-df["lat"] = df.lat.apply(dms_to_dd)
-df["lon"] = df.lon.apply(dms_to_dd)
+df["lat"] = ps.dms_to_dd(df.lat)
+df["lon"] = ps.dms_to_dd(df.lon)
 
 # Add TA flag column
 df["TA_flag"] = 2
@@ -1,9 +1,10 @@
 import pandas as pd
 from datetime import datetime
+import processing_scripts as ps
 
 # Load underway pH data
 # df = pd.read_csv("data/processing/optode/A10_uws_correct_pH.csv")
-df = pd.read_csv("data/processing/optode/A17_uws_correct_pH_bootstrapping_subsaomples_uncertainty.csv")
+df = ps.read_intermediate("data/processing/optode/A17_uws_correct_pH_bootstrapping_subsaomples_uncertainty.csv")
 
 # Create EXPOCODE and Cruise ID column
 df["EXPOCODE"] = "06S220220218"
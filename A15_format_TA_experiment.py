@@ -1,10 +1,11 @@
 import pandas as pd
 import calkulate as calk
 from datetime import datetime
+import processing_scripts as ps
 
 # === ALKALINITY SAMPLES
 # Import TA only data post-R2CO2 processing for TA experiment
-TALK = pd.read_csv("data/processing/vindta/SO289_TA_exp_TA_only_results.csv")
+TALK = ps.read_intermediate("data/processing/vindta/SO289_TA_exp_TA_only_results.csv")
 
 # Drop suffix
 TALK["bottle"] = TALK["bottle"].str.replace("AE-", "", regex=True)
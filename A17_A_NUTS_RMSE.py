@@ -1,7 +1,8 @@
 import pandas as pd, numpy as np
+import processing_scripts as ps
 
 # Load data
-df = pd.read_csv("data/processing/vindta/A02_process_SO289.csv")
+df = ps.read_intermediate("data/processing/vindta/A02_process_SO289.csv")
 
 # Only keep columns of interest
 df = df[['analysis_datetime', 'bottle', 'alkalinity', 'dic']]
@@ -1,68 +1,102 @@
 import pandas as pd
 import numpy as np
-import PyCO2SYS as pyco2
+import processing_scripts as ps
 
 # Load data
-subsamples = pd.read_csv("data/processing/vindta/SO289_underway_TA_DIC_only_results.csv")
+subsamples = ps.read_intermediate("data/processing/vindta/SO289_underway_TA_DIC_only_results.csv")
 
 # Import RMSE for TALK and DIC based on NUTS analysis
 talk_rmse = 0.9189418360170623
 dic_rmse = 1.9537907404909995
 
-# Number of Monte Carlo iterations
-n_iterations = 1000
+# Uncertainty propagation: "monte_carlo", or "linear" to propagate the TALK and
+# DIC RMSE to first order (much faster), checked against Monte Carlo on a
+# subset of the subsamples
+method = "monte_carlo"
 
-# Initialize a DataFrame to store pH values
-# Add 'subsample_index' to keep track of each subsample across iterations
-pH_values = pd.DataFrame({
-    'iteration': np.repeat(np.arange(n_iterations), len(subsamples)),
-    'subsample_index': np.tile(np.arange(len(subsamples)), n_iterations),
-    'pH_total_est_TA_DIC': np.zeros(n_iterations * len(subsamples))
-})
+# Monte Carlo iterations are run in batches, until the RMSE of pH of every
+# subsample is known within tolerance (or max_iterations is reached)
+tolerance = 1e-4
+max_iterations = 100000
 
-# Monte Carlo simulation
-for i in range(n_iterations):
-    # Generate random samples for TALK and DIC within +/- RMSE
-    talk_samples = subsamples['alkalinity'] + np.random.normal(0, talk_rmse, subsamples.shape[0])
-    dic_samples = subsamples['DIC'] + np.random.normal(0, dic_rmse, subsamples.shape[0])
+# Also split the pH variance by source of uncertainty (a further PyCO2SYS run
+# over 1000 joint draws of every subsample)
+run_uncertainty_budget = False
 
-    # Calculate pH using the randomly sampled TA and DIC
-    ph_results = pyco2.sys(
-        par1=talk_samples.to_numpy(),
-        par2=dic_samples.to_numpy(),
-        par1_type=1,
-        par2_type=2,
-        opt_pH_scale=1,
-        salinity=subsamples["SBE45_sal"].to_numpy(),
-        temperature=subsamples["SBE38_water_temp"].to_numpy()
-    )['pH_total']
-
-    # Store results in DataFrame
-    pH_values.loc[pH_values['iteration'] == i, 'pH_total_est_TA_DIC'] = ph_results
-
-# Compute the mean pH for each subsample
-mean_pH = pH_values.groupby('subsample_index')['pH_total_est_TA_DIC'].mean()
-
-# Merge the mean pH back into the original DataFrame to compute differences
-pH_values = pH_values.merge(mean_pH.rename('mean_pH'), on='subsample_index')
-
-# Calculate squared differences from the mean
-pH_values['squared_differences'] = (pH_values['pH_total_est_TA_DIC'] - pH_values['mean_pH'])**2
-
-# Compute mean of squared differences (MSE) for each subsample and then take the square root (RMSE)
-rmse_pH = np.sqrt(pH_values.groupby('subsample_index')['squared_differences'].mean())
+if method == "linear":
+    # pH uncertainty of each subsample from the derivatives of pH to TALK and DIC
+    pH_RMSE = ps.linear_uncertainty_pH(
+        subsamples['alkalinity'],
+        subsamples['DIC'],
+        talk_rmse,
+        dic_rmse,
+        salinity=subsamples["SBE45_sal"],
+        temperature=subsamples["SBE38_water_temp"]
+    )[1]
+    uncertainty_check = ps.compare_uncertainty(
+        subsamples['alkalinity'],
+        subsamples['DIC'],
+        talk_rmse,
+        dic_rmse,
+        salinity=subsamples["SBE45_sal"],
+        temperature=subsamples["SBE38_water_temp"]
+    )
+else:
+    # Monte Carlo simulation
+    # Running mean and RMSE of pH of each subsample, calculated from TALK and DIC
+    # drawn within +/- RMSE, without keeping every draw
+    mean_pH, pH_RMSE, n_iterations = ps.streaming_monte_carlo_pH(
+        subsamples['alkalinity'],
+        subsamples['DIC'],
+        talk_rmse,
+        dic_rmse,
+        salinity=subsamples["SBE45_sal"],
+        temperature=subsamples["SBE38_water_temp"],
+        tolerance=tolerance,
+        max_iterations=max_iterations
+    )
+rmse_pH = pd.Series(pH_RMSE, name='pH_RMSE').rename_axis('subsample_index')
 
 # The result is a series where the index is the subsample_index and the value is the RMSE of pH for that subsample
 print(rmse_pH)
 
+#%%
+# === Uncertainty budget
+# Variance of pH of each subsample due to each source of uncertainty,
+# separately and jointly. Nutrients were not measured on the underway samples,
+# so they are left at zero with an uncertainty spanning the surface South
+# Pacific, and the constants of Lueker et al. (2000) are compared with those of
+# Sulpis et al. (2020), which are used for the optode pH
+if run_uncertainty_budget:
+    budget = ps.pH_uncertainty_budget(
+        subsamples['alkalinity'],
+        subsamples['DIC'],
+        subsamples["SBE45_sal"],
+        subsamples["SBE38_water_temp"],
+        uncertainties={
+            "alkalinity": talk_rmse,
+            "dic": dic_rmse,
+            "temperature": 0.002,
+            "salinity": 0.01,
+            "total_silicate": 2,
+            "total_phosphate": 0.2,
+        },
+        opt_k_carbonic=[10, 16]
+    )
+
+    # Share of the pH variance of each source, averaged over the subsamples
+    print(budget.drop(columns=["total", "joint"]).div(budget["total"], axis=0).mean())
+
 #%%
 # === ADD uncertainty to df of subsamples
 rmse_df = rmse_pH.reset_index()
-rmse_df.columns = ['subsample_index', 'pH_RMSE']
+if method != "linear":
+    # Record the number of Monte Carlo iterations each RMSE converged in
+    rmse_df['pH_RMSE_iterations'] = n_iterations
 subsamples['subsample_index'] = subsamples.index  # only add this if not already present
 
 # Merge the RMSE data with the original subsamples data
 subsamples_with_uncertainty = pd.merge(subsamples, rmse_df, on='subsample_index', how='left')
 
 # Save the merged DataFrame or perform further analysis
-subsamples_with_uncertainty.to_csv("data/processing/vindta/SO289_underway_TA_DIC_only_results_with_uncertainty.csv", index=False)
+ps.write_intermediate(subsamples_with_uncertainty, "data/processing/vindta/SO289_underway_TA_DIC_only_results_with_uncertainty.csv", index=False)
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+import processing_scripts as ps
 # from sklearn.metrics import r2_score
 
 # === SO279
@@ -26,7 +27,7 @@ atlantic['residuals'] = atlantic['TA'] - atlantic['ta_est']
 
 # === SO289
 # Load discrete samples data
-pacific = pd.read_csv("data/processing/vindta/SO289_underway_TA_DIC_only_results_with_uncertainty.csv")
+pacific = ps.read_intermediate("data/processing/vindta/SO289_underway_TA_DIC_only_results_with_uncertainty.csv")
 
 # Drop outlier
 L = pacific['alkalinity'] < 2030
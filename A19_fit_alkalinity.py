@@ -2,9 +2,10 @@ import pandas as pd, numpy as np
 from scipy.optimize import least_squares
 from scipy import stats
 from matplotlib import pyplot as plt
+import processing_scripts as ps
 
 # Load discrete samples data
-df = pd.read_csv("data/processing/vindta/SO289_underway_TA_DIC_only_results_with_uncertainty.csv")
+df = ps.read_intermediate("data/processing/vindta/SO289_underway_TA_DIC_only_results_with_uncertainty.csv")
 
 # Drop outlier
 L = df['alkalinity'] < 2000
@@ -74,15 +75,16 @@ temperature_uncertainty = 0.002
 salinity_uncertainty = 0.01
 dic_uncertainty = 2.4
 
-alkalinity_pred_temp = (
-    get_alkalinity(coeffs, sss, sst + temperature_uncertainty, dic) - df["talk_fit"]
-).max()
-alkalinity_pred_salinity = (
-    get_alkalinity(coeffs, sss + salinity_uncertainty, sst, dic) - df["talk_fit"]
-).max()
-alkalinity_pred_dic = (
-    get_alkalinity(coeffs, sss, sst, dic + dic_uncertainty) - df["talk_fit"]
-).max()
+# Variance of the fitted alkalinity of each sample due to each of them,
+# separately and jointly, in one evaluation of the fit
+alkalinity_budget = ps.uncertainty_budget(
+    lambda sss, sst, dic: get_alkalinity(coeffs, sss, sst, dic),
+    {"sss": sss, "sst": sst, "dic": dic},
+    {"sst": temperature_uncertainty, "sss": salinity_uncertainty, "dic": dic_uncertainty},
+)
+
+# Largest change of the fitted alkalinity due to each of them
+print(np.sqrt(alkalinity_budget.max()))
 
 # ^^^ these are negligible compared to RMSE = 5.44
 # And if you do np.sqrt(0.5**2 + 5.44**2) to add the salinity uncertainty, still less
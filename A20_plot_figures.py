@@ -0,0 +1,10 @@
+# This script renders the figures of the processing scripts (A03, A08, A10, A16
+# and A17) from the files they saved, without displaying them, and in parallel
+# when run by A00. Figures whose input files are missing are skipped
+
+import processing_scripts as ps
+
+# The figures are rendered in a pool of processes when run by A00, which must
+# not run this script again as they start
+if __name__ == "__main__":
+    ps.render_figures(max_workers=ps.get_pool_workers())
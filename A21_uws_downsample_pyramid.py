@@ -0,0 +1,19 @@
+# This script downsamples the corrected continuous underway pH, temperature and
+# salinity into 1 min, 10 min and 1 h bins (mean, std, min, max and count), so
+# that overviews and comparisons do not have to go through the 1 Hz data
+# (read them with ps.read_pyramid)
+
+import processing_scripts as ps
+from processing_scripts.pyramid import PYRAMID_FILE
+
+# Import UWS continuous pH data
+df = ps.read_intermediate("data/processing/optode/A10_uws_correct_pH.csv")
+
+# Downsample each tier from the previous one
+pyramid = ps.build_pyramid(
+    df, ["pH_optode_corrected", "pH_insitu_ta_est", "SBE38_water_temp", "SBE45_sal"]
+)
+
+# Save each tier to .csv
+for freq, tier in pyramid.items():
+    ps.write_intermediate(tier, PYRAMID_FILE.format(freq), index=False)
@@ -0,0 +1,59 @@
+# This script measures how long it takes to import processing_scripts and its
+# functions, each in a fresh Python interpreter.  Run it from the repo root:
+#   python benchmarks/import_time.py [--repeat 5]
+
+import argparse, os, statistics, subprocess, sys, time
+
+parser = argparse.ArgumentParser(description="Time imports of processing_scripts.")
+parser.add_argument(
+    "--repeat", type=int, default=5, help="number of interpreters per import"
+)
+args = parser.parse_args()
+
+# Statements to time, from the bare package to the heaviest functions
+statements = [
+    "import processing_scripts",
+    "from processing_scripts import read_pyrosci",
+    "from processing_scripts import smb",
+    "from processing_scripts import raw_process",
+    "from processing_scripts import run_pipeline",
+    "from processing_scripts import salinity",
+    "from processing_scripts import alkalinity",
+]
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_statement(statement):
+    """Return the wall time (s) of a fresh interpreter running a statement."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", statement], cwd=root, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1]
+    return elapsed, None
+
+
+# Baseline: starting the interpreter itself
+baseline = statistics.median(time_statement("pass")[0] for _ in range(args.repeat))
+print("{:<48} {:>8.3f} s".format("python (no import)", baseline))
+
+for statement in statements:
+    times = []
+    for _ in range(args.repeat):
+        elapsed, error = time_statement(statement)
+        if error:
+            break
+        times.append(elapsed)
+    if error:
+        print("{:<48} {:>10}  ({})".format(statement, "failed", error))
+    else:
+        print(
+            "{:<48} {:>8.3f} s (+{:.3f} s)".format(
+                statement,
+                statistics.median(times),
+                statistics.median(times) - baseline,
+            )
+        )
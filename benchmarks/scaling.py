@@ -0,0 +1,184 @@
+# This script benchmarks how the processing scales with the size of the cruise:
+# for each number of days, it writes synthetic raw data (see synthetic_data.py)
+# to a temporary folder, runs the selected stages on it one after the other and
+# reports their wall time, rows per second and peak memory (RSS).
+# Run it from the repo root, e.g.:
+#   python benchmarks/scaling.py --days 1 4 16 --stages A04 A07 A08
+# The CPU time is not measured on Windows, and the peak memory is only exact on
+# Linux (see profiling.peak_rss_mb).
+
+import argparse, json, os, shutil, subprocess, sys, tempfile, time
+import synthetic_data
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+from processing_scripts import intermediates
+from processing_scripts.pipeline import get_stages, build_graph
+
+parser = argparse.ArgumentParser(
+    description="Benchmark the processing at scale.",
+    epilog="The CPU time is not measured on Windows, and the peak memory is only "
+    "exact on Linux.",
+)
+parser.add_argument(
+    "--days", type=int, nargs="+", default=[1, 2, 4], help="cruise lengths to test"
+)
+parser.add_argument(
+    "--stages",
+    nargs="+",
+    default=["A04", "A07", "A08", "A09"],
+    help="stages to run (default: A04 A07 A08 A09)",
+)
+parser.add_argument(
+    "--interval", type=float, default=1, help="PyroScience sampling interval (s)"
+)
+parser.add_argument(
+    "--smb-interval", type=float, default=1, help="SMB sampling interval (s)"
+)
+parser.add_argument("--output", help="also save the results to this .json file")
+parser.add_argument(
+    "--keep", action="store_true", help="keep the synthetic data folders"
+)
+args = parser.parse_args()
+
+stages = get_stages(args.stages)
+graph = build_graph(stages)
+
+
+def count_rows(path, rows):
+    """Return the number of rows of an input or output file, if known."""
+    if path in rows:
+        return rows[path]
+    if not intermediates.stored_files(path):
+        return 0
+    try:
+        return len(intermediates.read_intermediate(path))
+    except Exception:
+        return 0
+
+
+# Runs a script and saves its peak RSS (in MB, or null if unknown) when it
+# exits.  On Linux it is read from /proc, as the RSS from getrusage would
+# include the memory of this process, which is kept across fork and exec
+RUNNER = """
+import atexit, json, runpy, sys
+from processing_scripts.profiling import peak_rss_mb
+
+def save_peak_rss(path):
+    with open(path, "w") as f:
+        json.dump(peak_rss_mb(), f)
+
+atexit.register(save_peak_rss, sys.argv[2])
+script = sys.argv[1]
+sys.argv = [script]
+runpy.run_path(script, run_name="__main__")
+"""
+
+
+def children_cpu_time():
+    """Return the CPU time of the finished child processes, None on Windows."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_stage(stage, cwd):
+    """Run a stage script in cwd and return its wall time, CPU time and peak RSS."""
+    env = dict(os.environ, PYTHONPATH=root, MPLBACKEND="Agg")
+    peak_file = os.path.join(cwd, ".peak_rss")
+    # The stages run one at a time, so the CPU time of the children that
+    # finished meanwhile is that of the stage (and of its pools)
+    start_cpu = children_cpu_time()
+    with tempfile.TemporaryFile() as stderr:
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-c", RUNNER, os.path.join(root, stage.script), peak_file],
+            cwd=cwd,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=stderr,
+        )
+        process.wait()
+        wall = time.perf_counter() - start
+        stderr.seek(0)
+        error = stderr.read().decode(errors="replace").strip()
+    cpu = None if start_cpu is None else children_cpu_time() - start_cpu
+    peak_rss = None
+    if os.path.exists(peak_file):
+        with open(peak_file) as f:
+            peak_rss = json.load(f)
+        os.remove(peak_file)
+    return {
+        "wall_s": wall,
+        "cpu_s": cpu,
+        "peak_rss_mb": peak_rss,
+        "error": error.splitlines()[-1] if process.returncode and error else None,
+        "ok": process.returncode == 0,
+    }
+
+
+results = []
+print(
+    "{:>5} {:<6} {:>8} {:>8} {:>12} {:>12} {:>12} {:>10}".format(
+        "days", "stage", "status", "wall s", "rows in", "rows out", "rows/s", "RSS MB"
+    )
+)
+for days in args.days:
+    cwd = tempfile.mkdtemp(prefix="so289_{}d_".format(days))
+    for folder in ["optode", "vindta"]:
+        os.makedirs(os.path.join(cwd, "data/processing", folder), exist_ok=True)
+    rows = synthetic_data.generate(cwd, days, args.interval, args.smb_interval)
+    failed = set()
+    os.chdir(cwd)
+    try:
+        for stage in stages:
+            result = {"days": days, "stage": stage.name}
+            if any(dep in failed for dep in graph[stage.name]):
+                failed.add(stage.name)
+                result.update(ok=False, error="skipped: a previous stage failed")
+                results.append(result)
+                print("{:>5} {:<6} {:>8}".format(days, stage.name, "skipped"))
+                continue
+            result.update(run_stage(stage, cwd))
+            result["rows_in"] = sum(count_rows(path, rows) for path in stage.inputs)
+            result["rows_out"] = sum(count_rows(path, rows) for path in stage.outputs)
+            results.append(result)
+            if result["ok"]:
+                result["rows_per_s"] = result["rows_in"] / result["wall_s"]
+            else:
+                failed.add(stage.name)
+            print(
+                "{:>5} {:<6} {:>8} {:>8.2f} {:>12,d} {:>12,d} {:>12} {:>10}".format(
+                    days,
+                    stage.name,
+                    "ok" if result["ok"] else "failed",
+                    result["wall_s"],
+                    result["rows_in"],
+                    result["rows_out"],
+                    "{:,.0f}".format(result["rows_per_s"]) if result["ok"] else "-",
+                    (
+                        "-"
+                        if result["peak_rss_mb"] is None
+                        else "{:.1f}".format(result["peak_rss_mb"])
+                    ),
+                )
+            )
+            if result["error"]:
+                print("      {}".format(result["error"]))
+    finally:
+        os.chdir(root)
+        if not args.keep:
+            shutil.rmtree(cwd)
+        else:
+            print("Synthetic data kept in {}".format(cwd))
+
+if args.output:
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
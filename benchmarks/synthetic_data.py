@@ -0,0 +1,449 @@
+# This script writes synthetic SO289-like raw data files, in the formats and
+# folders read by the processing scripts, to benchmark the processing at any
+# scale.  Run it from the repo root, e.g.:
+#   python benchmarks/synthetic_data.py /tmp/so289_synthetic --days 10
+# and then run processing scripts with the output folder as working directory.
+
+import argparse, os
+import pandas as pd, numpy as np
+
+START = pd.Timestamp("2022-02-24 00:00:00")
+
+# Header of the text files exported by PyroScience Workbench (22 lines)
+PYROSCI_HEADER = """#--- Experiment ------------------------------------------------------------------
+#{name}
+#Starting {start:%d/%m/%Y} at {start:%H:%M}
+#--- System ----------------------------------------------------------------------
+#Data from PyroScience Workbench V1.2.8.1536   www.pyroscience.com
+#SYNTHETIC
+#--- Instrument ------------------------------------------------------------------
+#Device: Pico-pH-SUB [A] PICO-pH SN:0000000000000000 Firmware:4.05 Build:002
+#--- Channel ---------------------------------------------------------------------
+#Channel [A Ch.1] - pH Sensor - XCF7-000-000
+#--- Settings & Calibration ------------------------------------------------------
+#Settings:\tDuration\tIntensity\tAmp\tFrequency (Hz)
+#\t16 ms\t60% (F)\t10M (400x)\t3000
+#Calibration:\tlastCal1\tlastCal2\tpka (pH)\tslope
+#\t22/02/2022\t22/02/2022\t8.019000\t1.033000
+#--- Temperature Compensation Channel --------------------------------------------
+#Compensation Channel [A T1] - PT100 Temperature Sensor - Calibration offset = 0.24°C
+#Settings: n/a
+#Calibration: n/a
+#--- Channel ---------------------------------------------------------------------
+#Channel [A T1] - PT100 Temperature Sensor - Calibration offset = 0.24°C
+#--- Measurement Data ------------------------------------------------------------
+"""
+
+PYROSCI_COLUMNS = [
+    "Date [A Ch.1 Main]",
+    "Time [A Ch.1 Main]",
+    " dt (s) [A Ch.1 Main]",
+    "pH [A Ch.1 Main]",
+    "pH (pH) [A Ch.1 Main]",
+    "dphi (°) [A Ch.1 Main]",
+    "Signal Intensity (mV) [A Ch.1 Main]",
+    "Ambient Light (mV) [A Ch.1 Main]",
+    "ldev (nm) [A Ch.1 Main]",
+    "Status [A Ch.1 Main]",
+    "Date [A Ch.1 CompT]",
+    "Time [A Ch.1 CompT]",
+    " dt (s) [A Ch.1 CompT]",
+    "Sample Temp. (°C) [A Ch.1 CompT]",
+    "Status [A Ch.1 CompT]",
+    "Date [A T1]",
+    "Time [A T1]",
+    " dt (s) [A T1]",
+    "Sample Temp. (°C) [A T1]",
+    "Status [A T1]",
+    "Date [Comment]",
+    "Time [Comment]",
+    "Comment",
+]
+
+# Columns of the SMB file, besides "date time" (see processing_scripts/initools/smb.py)
+SMB_COLUMNS = [
+    "Weatherstation.PDWDC.Airtemperature",
+    "Weatherstation.PDWDC.Barometric",
+    "Weatherstation.PDWDC.Heading",
+    "Weatherstation.PDWDC.Humidity",
+    "Weatherstation.PDWDC.Windspeed_true",
+    "SMB.RSSMB.Chl",
+    "SMB.RSSMB.C_SBE45",
+    "SMB.RSSMB.Date",
+    "SMB.RSSMB.Flow",
+    "SMB.RSSMB.Latitude",
+    "SMB.RSSMB.Longitude",
+    "SMB.RSSMB.Name",
+    "SMB.RSSMB.Sal_SBE45",
+    "SMB.RSSMB.Status",
+    "SMB.RSSMB.T_SBE38",
+    "SMB.RSSMB.T_SBE45",
+    "SMB.RSSMB.Time",
+]
+
+DBS_COLUMNS = [
+    "run type",
+    "bottle",
+    "station",
+    "cast",
+    "niskin",
+    "depth",
+    "i.s. temperature",
+    "salinity",
+    "counts",
+    "run time",
+    "CT",
+    "factor CT",
+    "blank",
+    "TCT",
+    "last CRM CT",
+    "cert. CRM CT",
+    "last CRM AT",
+    "cert. CRM AT",
+    "batch",
+    "AT",
+    "factor AT",
+    "rms",
+    "calc ID",
+    "Titrino",
+    "sample line",
+    "pip vol",
+    "comment",
+    "Lat.",
+    "Long.",
+    "date",
+    "time",
+    "cell ID",
+]
+
+
+def _sea_temperature(date_time):
+    """Return a seawater temperature (°C) with a trend and a daily cycle."""
+    days = (date_time - START) / pd.Timedelta(days=1)
+    return 24 + 4 * np.sin(days / 20) + 0.5 * np.sin(2 * np.pi * days)
+
+
+def _position(date_time):
+    """Return the latitude and longitude (decimal degrees) of the ship."""
+    days = (date_time - START) / pd.Timedelta(days=1)
+    return -30 + 0.5 * days, -160 + 1.2 * days
+
+
+def _dms(decimals, positive, negative):
+    """Format decimal degrees as in the SMB file, e.g. 12° 34.5678' S."""
+    degrees = np.abs(decimals)
+    minutes = (degrees % 1) * 60
+    direction = np.where(decimals < 0, negative, positive)
+    return [
+        "{:d}° {:07.4f}' {}".format(int(d), m, h)
+        for d, m, h in zip(degrees, minutes, direction)
+    ]
+
+
+def write_pyrosci(root, days, interval=1, seed=0):
+    """Write one PyroScience text file per day, and the file list, under root.
+
+    Returns the number of data rows written.
+    """
+    rng = np.random.default_rng(seed)
+    names = []
+    rows = 0
+    for day in range(days):
+        start = START + pd.Timedelta(days=day, seconds=1.461)
+        name = "{:%Y-%m-%d_%H%M%S}_SYN".format(start)
+        names.append(name)
+        date_time = start + pd.to_timedelta(
+            np.arange(0, 86400, interval, dtype=float), unit="s"
+        )
+        n = len(date_time)
+        temp = _sea_temperature(date_time) + rng.normal(0, 0.02, n)
+        pH = 8.0 + 0.05 * np.sin(np.arange(n) / n * 2 * np.pi) + rng.normal(0, 0.002, n)
+        date = date_time.strftime("%d-%m-%Y")
+        time = date_time.strftime("%H:%M:%S.%f").str[:-3]
+        sec = np.round(np.arange(n) * interval + 0.024, 3)
+        data = pd.DataFrame(
+            {
+                "date": date,
+                "time": time,
+                "sec": sec,
+                "pH": pH.round(3),
+                "pH_pH": pH.round(3),
+                "dphi": (28.8 + rng.normal(0, 0.01, n)).round(3),
+                "signal_intensity": rng.integers(295, 305, n),
+                "ambient_light": rng.integers(-3, 3, n),
+                "ldev": (622.7 + rng.normal(0, 0.01, n)).round(3),
+                "status_ph": "OK",
+                "date_T": date,
+                "time_T": time,
+                "sec_T": sec,
+                "temp_cell": temp.round(3),
+                "status_temp": "OK",
+                "date_T1": date,
+                "time_T1": time,
+                "sec_T1": sec,
+                "temp_T1": temp.round(3),
+                "status_T1": "OK",
+            }
+        )
+        folder = os.path.join(root, "data/underway/pH", name)
+        os.makedirs(folder, exist_ok=True)
+        with open(
+            os.path.join(folder, name + ".txt"), "w", encoding="latin-1", newline="\n"
+        ) as f:
+            f.write(PYROSCI_HEADER.format(name=name, start=start))
+            f.write("\t".join(PYROSCI_COLUMNS) + "\n")
+            data.to_csv(f, sep="\t", header=False, index=False)
+        rows += n
+
+    # List of files, as in SO289_UWS_continuous_file_list.xlsx
+    file_list = pd.DataFrame(
+        {
+            "location": ["#"] + ["UWS"] * days,
+            "sample": ["#"] + list(range(1, days + 1)),
+            "pH_optN": ["file name"] + names,
+            "comments": np.nan,
+            "flag": [np.nan] + [2] * days,
+        }
+    )
+    file_list.to_excel(
+        os.path.join(root, "data/underway/SO289_UWS_continuous_file_list.xlsx"),
+        index=False,
+    )
+    return rows
+
+
+def write_smb(root, days, interval=1, seed=1):
+    """Write the SMB thermosalinograph file under root.
+
+    Returns the number of data rows written.
+    """
+    rng = np.random.default_rng(seed)
+    date_time = START + pd.to_timedelta(np.arange(0, days * 86400, interval), unit="s")
+    n = len(date_time)
+    lat, lon = _position(date_time)
+    temp = _sea_temperature(date_time)
+    smb = pd.DataFrame(
+        {
+            "date time": date_time.strftime("%Y/%m/%d %H:%M:%S"),
+            "Weatherstation.PDWDC.Airtemperature": (temp - 2).round(2),
+            "Weatherstation.PDWDC.Barometric": (1013 + rng.normal(0, 2, n)).round(1),
+            "Weatherstation.PDWDC.Heading": rng.uniform(0, 360, n).round(1),
+            "Weatherstation.PDWDC.Humidity": rng.uniform(60, 90, n).round(1),
+            "Weatherstation.PDWDC.Windspeed_true": rng.uniform(0, 15, n).round(1),
+            "SMB.RSSMB.Chl": rng.uniform(0.05, 0.3, n).round(3),
+            "SMB.RSSMB.C_SBE45": (5.4 + rng.normal(0, 0.01, n)).round(4),
+            "SMB.RSSMB.Date": date_time.strftime("%d.%m.%Y"),
+            "SMB.RSSMB.Flow": (1.5 + rng.normal(0, 0.05, n)).round(2),
+            "SMB.RSSMB.Latitude": _dms(lat, "N", "S"),
+            "SMB.RSSMB.Longitude": _dms(lon, "E", "W"),
+            "SMB.RSSMB.Name": "RSSMB",
+            "SMB.RSSMB.Sal_SBE45": (35.2 + rng.normal(0, 0.01, n)).round(4),
+            "SMB.RSSMB.Status": "A",
+            "SMB.RSSMB.T_SBE38": (temp + rng.normal(0, 0.01, n)).round(4),
+            "SMB.RSSMB.T_SBE45": (temp + 0.3).round(4),
+            "SMB.RSSMB.Time": date_time.strftime("%H:%M:%S"),
+        }
+    )[["date time"] + SMB_COLUMNS]
+
+    # The two rows below the header (units and sensor names) are skipped by read_smb()
+    folder = os.path.join(root, "data/underway/SMB")
+    os.makedirs(folder, exist_ok=True)
+    with open(
+        os.path.join(folder, "SMB_data_galley.dat"), "w", encoding="latin-1"
+    ) as f:
+        f.write(",".join(smb.columns) + "\n")
+        f.write(",".join(["-"] * smb.shape[1]) + "\n")
+        f.write(",".join(["-"] * smb.shape[1]) + "\n")
+        smb.to_csv(f, header=False, index=False)
+    return n
+
+
+def write_uws_samples(root, days, every_hours=6):
+    """Write the list of underway subsamples and their QuAAtro DIC results.
+
+    Returns the number of subsamples.
+    """
+    date_time = pd.date_range(
+        START + pd.Timedelta(hours=1),
+        periods=days * 24 // every_hours,
+        freq="{}h".format(every_hours),
+    )
+    bottles = ["SO289-{:%d%m%Y-%H-%M}".format(d) for d in date_time]
+    folder = os.path.join(root, "data/processing")
+    os.makedirs(folder, exist_ok=True)
+    pd.DataFrame({"bottle": bottles}).to_csv(
+        os.path.join(folder, "list_uws_samples.csv"), index=False
+    )
+
+    # QuAAtro DIC results, as in data/quaatro/DIC_vials
+    rng = np.random.default_rng(2)
+    folder = os.path.join(root, "data/quaatro/DIC_vials")
+    os.makedirs(folder, exist_ok=True)
+    pd.DataFrame(
+        {
+            "Sample": date_time.strftime("%d/%m/%y %H:%M"),
+            "date_time": date_time.strftime("%d/%m/%y %H:%M"),
+            "DIC": (2000 + rng.normal(0, 10, len(date_time))).round(1),
+            "Flag": 2,
+        }
+    ).to_excel(
+        os.path.join(folder, "230112 DIC LOUISE DR1R1_format_friendly.xlsx"),
+        index=False,
+    )
+    return len(date_time)
+
+
+def _titration(alkalinity, dic, salinity=35, acid=0.1, sample_mass=0.1):
+    """Return the acid volumes (ml) and emf (mV) of a seawater titration."""
+    volume = np.arange(0, 4.2, 0.15)
+    acid_mass = volume * 1.02e-3
+    dilution = sample_mass / (sample_mass + acid_mass)
+    alkalinity = (alkalinity * 1e-6 * sample_mass - acid * acid_mass) / (
+        sample_mass + acid_mass
+    )
+    dic = dic * 1e-6 * dilution
+    borate = 4.16e-4 * salinity / 35 * dilution
+    k1, k2, kb, kw = 10**-5.85, 10**-8.97, 10**-8.6, 10**-13.2
+
+    # Solve the alkalinity balance for [H+] by bisection (on pH)
+    low, high = np.full(volume.size, 2.0), np.full(volume.size, 11.0)
+    for _ in range(60):
+        pH = (low + high) / 2
+        h = 10**-pH
+        balance = (
+            dic * (k1 * h + 2 * k1 * k2) / (h**2 + k1 * h + k1 * k2)
+            + borate * kb / (kb + h)
+            + kw / h
+            - h
+            - alkalinity
+        )
+        high = np.where(balance > 0, pH, high)
+        low = np.where(balance > 0, low, pH)
+    emf = 632 - 59.16 * pH
+    return volume, emf
+
+
+def write_vindta(
+    root,
+    days,
+    samples_per_day=20,
+    folder="data/vindta/TA_DIC",
+    name="64PE503_SO289_2022",
+    method="3C standard",
+    seed=3,
+):
+    """Write a VINDTA .dbs file, its titration files and logfile under root.
+
+    Each analysis day has a junk, NUTS at the start and end, a CRM and
+    samples.  Returns the number of titrations written.
+    """
+    rng = np.random.default_rng(seed)
+    titrations = os.path.join(root, folder, name)
+    os.makedirs(titrations, exist_ok=True)
+    dbs = []
+    logfile = []
+    for day in range(days):
+        start = pd.Timestamp("2022-10-17 08:00") + pd.Timedelta(days=day)
+        cell_id = "C_{:%b%d-%y}_08{:02d}".format(start, day % 100)
+        bottles = (
+            ["JUNK{:02d}".format(day % 100), "NUTSLAB{:02d}".format(day % 100)]
+            + ["CRM-198-{:04d}-01".format(day)]
+            + [
+                "SO289-{}".format(40000 + day * samples_per_day + s)
+                for s in range(samples_per_day)
+            ]
+            + ["NUTSLAB{:02d}".format(day % 100)]
+        )
+        for i, bottle in enumerate(bottles):
+            analysis = start + pd.Timedelta(minutes=16 * i)
+            alkalinity = 2300 + rng.normal(0, 20)
+            dic = 2000 + rng.normal(0, 20) + 0.5 * i  # with some coulometer drift
+            volume, emf = _titration(alkalinity, dic)
+            emf += rng.normal(0, 0.05, emf.size)
+            dbs.append(
+                ["bottle", bottle, 0, 0, 0, 0, 4.0, 35.0, 200000, 11]
+                + [round(dic, 2), 1.0, 50.0, round(0.5 * i, 1), 0.0, 2037.68]
+                + [0.0, 2224.30, 198, round(alkalinity, 2), "", 0.0003, 1]
+                + ["", "red (1)", 20.0, "", 0.0, 0.0]
+                + [
+                    "{:%m/%d/%y}".format(analysis),
+                    "{:%H:%M}".format(analysis),
+                    cell_id,
+                ]
+            )
+            file_name = "0-0  0  (0){}".format(bottle)
+            with open(os.path.join(titrations, file_name + ".dat"), "w") as f:
+                f.write(
+                    "bottle\t{}\t0\t0\t0\t0\t0.00\t0.00\t35.000\t4.000\t0.00\t0.0\n".format(
+                        bottle
+                    )
+                )
+                f.write("25.000\t35.000\t0.000\t0.000\n")
+                for v, e in zip(volume, emf):
+                    f.write("{:.3f}\t{:.3f}\t25.000\n".format(v, e))
+
+            # Coulometer counts of the DIC analysis in the logfile
+            counts = np.cumsum(rng.integers(0, 90000, 11))
+            logfile.append(
+                "{}.mth run started {:%m/%d/%y  %H:%M}\n".format(method, analysis)
+                + "bottle\t{}\t0\t0\t0\t0\t0.00\t0.00\t35.000\t4.000\t0.00\t0.0\n".format(
+                    bottle
+                )
+                + "Begin titration at {:%H:%M}\n".format(
+                    analysis + pd.Timedelta(minutes=1)
+                )
+                + " \tTime\tCounts\tInc\tEP\n"
+                + "".join(
+                    "\t{}\t{}\t{}\t0\n".format(t + 1, c, c - p)
+                    for t, (c, p) in enumerate(zip(counts, np.r_[0, counts[:-1]]))
+                )
+                + " \tCT\tSalt\tpip. T\tblank\tdensity\tTCT\tcomment\t\n"
+                + " \t{:.2f}\t{:.2f}\t35.000\t25.00\t50.00\t1.02334\t{:.1f}\t\n\n\n".format(
+                    dic, alkalinity, 0.5 * i
+                )
+            )
+    pd.DataFrame(dbs, columns=DBS_COLUMNS).to_csv(
+        os.path.join(root, folder, name + ".dbs"), sep="\t", index=False
+    )
+    with open(os.path.join(root, folder, "logfile.bak"), "w") as f:
+        f.write("".join(logfile))
+    return len(dbs)
+
+
+def generate(root, days=1, interval=1, smb_interval=1, vindta_days=None):
+    """Write all synthetic raw data files under root.
+
+    Returns a dict of the number of data rows written, keyed by the input
+    paths declared in processing_scripts/pipeline.py.
+    """
+    if vindta_days is None:
+        vindta_days = days
+    return {
+        "data/underway/pH/": write_pyrosci(root, days, interval),
+        "data/underway/SMB/SMB_data_galley.dat": write_smb(root, days, smb_interval),
+        "data/processing/list_uws_samples.csv": write_uws_samples(root, days),
+        "data/vindta/TA_DIC/64PE503_SO289_2022/": write_vindta(root, vindta_days),
+        "data/vindta/TA_ONLY/SO289_TA_only/": write_vindta(
+            root,
+            vindta_days,
+            folder="data/vindta/TA_ONLY",
+            name="SO289_TA_only",
+            method="3C standard AT only",
+        ),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic SO289 raw data.")
+    parser.add_argument("root", help="folder to write the data/ folder into")
+    parser.add_argument("--days", type=int, default=1, help="number of cruise days")
+    parser.add_argument(
+        "--interval", type=float, default=1, help="PyroScience sampling interval (s)"
+    )
+    parser.add_argument(
+        "--smb-interval", type=float, default=1, help="SMB sampling interval (s)"
+    )
+    args = parser.parse_args()
+    rows = generate(args.root, args.days, args.interval, args.smb_interval)
+    for path, n in rows.items():
+        print("{:<48} {:>12,d} rows".format(path, n))
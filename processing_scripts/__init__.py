@@ -1,7 +1,68 @@
-from .initools.read_pyrosci import read_pyrosci
-from .initools.logbook import logbook
-from .initools.smb import smb
-from .salinity import salinity
-from .alkalinity import alkalinity
-from .process import raw_process
-from .process import bgc_process
\ No newline at end of file
+import importlib, sys, types
+
+# Submodules are only imported when one of their functions is first used, so
+# that e.g. reading the optode files does not pull in PyCO2SYS and scipy
+_functions = {
+    "read_pyrosci": ".initools.read_pyrosci",
+    "logbook": ".initools.logbook",
+    "smb": ".initools.smb",
+    "read_smb": ".initools.read_smb",
+    "dms_to_dd": ".initools.dms_to_dd",
+    "smb_store": ".initools.smb_store",
+    "smb_lookup": ".initools.smb_store",
+    "salinity": ".salinity",
+    "pump_segments": ".salinity",
+    "alkalinity": ".alkalinity",
+    "monte_carlo_pH": ".montecarlo",
+    "streaming_monte_carlo_pH": ".montecarlo",
+    "linear_uncertainty_pH": ".montecarlo",
+    "compare_uncertainty": ".montecarlo",
+    "uncertainty_budget": ".budget",
+    "pH_uncertainty_budget": ".budget",
+    "correction_sign": ".bootstrap",
+    "drift_correction": ".bootstrap",
+    "bootstrap_correction": ".bootstrap",
+    "raw_process": ".process",
+    "bgc_process": ".process",
+    "run_pipeline": ".pipeline",
+    "run_stage": ".pipeline",
+    "get_pool_workers": ".pipeline",
+    "read_intermediate": ".intermediates",
+    "write_intermediate": ".intermediates",
+    "render_figures": ".figures",
+    "match_nearest": ".timealign",
+    "align": ".timealign",
+    "build_pyramid": ".pyramid",
+    "read_pyramid": ".pyramid",
+}
+
+__all__ = list(_functions)
+
+
+def __getattr__(name):
+    if name not in _functions:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    function = getattr(importlib.import_module(_functions[name], __name__), name)
+    globals()[name] = function
+    return function
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_functions))
+
+
+class _Package(types.ModuleType):
+    # Importing a submodule binds it as an attribute of the package, which
+    # would hide the function of the same name (e.g. salinity in salinity.py),
+    # so the function is bound instead
+    def __setattr__(self, name, value):
+        if (
+            isinstance(value, types.ModuleType)
+            and name in _functions
+            and value.__name__ == __name__ + _functions[name]
+        ):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
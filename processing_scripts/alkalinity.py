@@ -1,39 +1,85 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import PyCO2SYS as pyco2
+from .profiling import profiled
 
+# PyCO2SYS computes hundreds of arrays (every constant and output, at input and
+# output conditions) for each row it is given, so the underway data are passed
+# to it in chunks of CHUNK_ROWS rows, and only the OUTPUTS (PyCO2SYS key: column
+# name) are kept of each chunk
+CHUNK_ROWS = 20000
+OUTPUTS = {"pH_total_out": "pH_insitu_ta_est"}
 
-def alkalinity(data):
-    df = data.copy()
 
-    def ta_zone1(SSS, SST):
-        """Estimate TA for cruise SO289"""
-        return (
-            2305
-            + 58.66 * (SSS - 35)
-            + 2.32 * (SSS - 35) ** 2
-            - 1.41 * (SST - 20)
-            + 0.040 * (SST - 20) ** 2
-        )
+def ta_zone1(SSS, SST):
+    """Estimate TA for cruise SO289"""
+    return (
+        2305
+        + 58.66 * (SSS - 35)
+        + 2.32 * (SSS - 35) ** 2
+        - 1.41 * (SST - 20)
+        + 0.040 * (SST - 20) ** 2
+    )
 
-    # create new column with results in dataset
-    df["ta_est"] = ta_zone1(df.SBE45_sal, df.SBE38_water_temp)
 
-    # recalculate pH at in-situ temperature (SBE38) using estimated TA
+def _insitu_chunk(ta_est, pH_cell, salinity, temp_cell, temp_insitu, outputs):
+    """Recalculate pH at in-situ temperature for one chunk."""
     carb_dict = pyco2.sys(
-        df.ta_est,
-        df.pH_cell,
+        ta_est,
+        pH_cell,
         1,
         3,
-        salinity=df.SBE45_sal,
-        temperature=df.temp_cell,
-        temperature_out=df.SBE38_water_temp,
+        salinity=salinity,
+        temperature=temp_cell,
+        temperature_out=temp_insitu,
         pressure=0,
         pressure_out=3,
         opt_pH_scale=1,
         opt_k_carbonic=16,
         opt_total_borate=1,
     )
+    return {key: carb_dict[key] for key in outputs}
+
+
+@profiled
+def alkalinity(data, outputs=OUTPUTS, chunk_rows=CHUNK_ROWS, max_workers=1):
+    """Estimate TA from salinity and temperature and use it to recalculate the
+    optode pH at in-situ temperature.
+
+    The chunks are computed one after the other, or in a pool of `max_workers`
+    processes (None for one per CPU), which must then be started from code
+    under if __name__ == "__main__": (see get_pool_workers).
+    """
+    df = data.copy()
+
+    # create new column with results in dataset
+    df["ta_est"] = ta_zone1(df.SBE45_sal, df.SBE38_water_temp)
+
+    # No chunks to concatenate without data
+    if len(df) == 0:
+        for column in outputs.values():
+            df[column] = np.array([], dtype=float)
+        return df
+
+    # recalculate pH at in-situ temperature (SBE38) using estimated TA
+    columns = ["ta_est", "pH_cell", "SBE45_sal", "temp_cell", "SBE38_water_temp"]
+    starts = range(0, len(df), chunk_rows)
+    chunks = [
+        [values[start : start + chunk_rows] for start in starts]
+        for values in (df[column].to_numpy() for column in columns)
+    ]
+    if max_workers == 1 or len(starts) <= 1:
+        results = list(map(_insitu_chunk, *chunks, [outputs] * len(starts)))
+    else:
+        max_workers = min(max_workers or os.cpu_count() or 1, len(starts))
+        with ProcessPoolExecutor(max_workers) as executor:
+            results = list(
+                executor.map(_insitu_chunk, *chunks, [outputs] * len(starts))
+            )
 
     # save in-situ pH to df
-    df["pH_insitu_ta_est"] = carb_dict["pH_total_out"]
+    for key, column in outputs.items():
+        df[column] = np.concatenate([np.ravel(result[key]) for result in results])
 
     return df
@@ -0,0 +1,162 @@
+import pandas as pd, numpy as np
+from scipy.interpolate import PchipInterpolator
+from .timealign import to_ns
+
+# The pH drift correction (the PCHIP interpolation of the offsets between the
+# subsamples and the optode) is added to the optode pH, except in the files
+# whose name contains one of SUBTRACT_FILES, where it is subtracted
+SUBTRACT_FILES = ["2022-03-24_003629_SO289_part_2"]
+
+# Largest number of (iteration, row) values of the bootstrap held at once
+BATCH_SIZE = 2000000
+
+
+def correction_sign(filenames, subtract=SUBTRACT_FILES):
+    """Return the sign (+1 or -1) of the drift correction of each row."""
+    codes, names = pd.factorize(pd.Series(filenames).astype(str))
+    signs = np.array([-1 if any(s in name for s in subtract) else 1 for name in names])
+    return signs[codes]
+
+
+def drift_correction(times, sample_times, offsets, sign):
+    """Interpolate the offsets at the subsamples (PCHIP, NaN outside them) to
+    `times` and return them with the sign of each row.
+
+    Subsamples with a non-finite offset are left out.  Returns None if fewer
+    than two are left.
+    """
+    sample_times = to_ns(sample_times)
+    offsets = np.asarray(offsets, dtype=float)
+    finite = np.isfinite(offsets)
+    if finite.sum() < 2:
+        return None
+    order = np.argsort(sample_times[finite], kind="stable")
+    pchip = PchipInterpolator(
+        sample_times[finite][order], offsets[finite][order], extrapolate=False
+    )
+    return sign * np.abs(pchip(to_ns(times)))
+
+
+def _batch_corrections(times, position, knots, offsets, selected, sign):
+    """Evaluate the drift corrections from the selected subsamples of each
+    iteration (rows of `selected`) at all times, in an (iterations, times)
+    array.
+
+    `knots` are the sorted times of the subsamples and `position` the number of
+    them at or before each time.  Iterations with fewer than two subsamples
+    selected are NaN.
+    """
+    n_iterations, n_knots = selected.shape
+    n_intervals = max(n_knots - 1, 1)
+    # Piecewise cubic coefficients of each iteration, highest order first, and
+    # the start of each of its intervals
+    coefficients = np.full((4, n_iterations, n_intervals), np.nan)
+    starts = np.zeros((n_iterations, n_intervals), dtype=np.int64)
+    ends = np.full(n_iterations, np.iinfo(np.int64).min)
+    counts = selected.sum(axis=1)
+    for i in np.flatnonzero(counts >= 2):
+        x = knots[selected[i]]
+        coefficients[:, i, : counts[i] - 1] = PchipInterpolator(
+            x, offsets[selected[i]]
+        ).c
+        starts[i, : counts[i] - 1] = x[:-1]
+        ends[i] = x[-1]
+
+    # Interval of each time in each iteration, from the number of its selected
+    # subsamples at or before the time, as an index into the flattened arrays
+    cumulative = np.zeros((n_iterations, n_knots + 1), dtype=np.int64)
+    np.cumsum(selected, axis=1, out=cumulative[:, 1:])
+    before = cumulative[:, position]
+    inside = (before >= 1) & (
+        (before < counts[:, np.newaxis]) | (times == ends[:, np.newaxis])
+    )
+    interval = np.clip(before - 1, 0, (counts - 2).clip(0)[:, np.newaxis])
+    interval += np.arange(n_iterations)[:, np.newaxis] * n_intervals
+
+    dx = (times - starts.ravel()[interval]).astype(float)
+    values = coefficients[0].ravel()[interval]
+    for order in range(1, 4):
+        values *= dx
+        values += coefficients[order].ravel()[interval]
+    return np.where(inside, sign * np.abs(values), np.nan)
+
+
+def bootstrap_correction(
+    values,
+    times,
+    sign,
+    sample_times,
+    offsets,
+    n_iterations,
+    fraction_to_omit,
+    always_keep=None,
+    batch_size=BATCH_SIZE,
+    seed=None,
+):
+    """Bootstrap the pH drift correction by omitting subsamples at random.
+
+    In each iteration, `fraction_to_omit` of the subsamples (other than those
+    in the boolean mask `always_keep`) are left out before the correction is
+    interpolated, as in drift_correction.  The iterations are evaluated in
+    batches of up to `batch_size` values, on the int64 times, without copying
+    the data.  An iteration with fewer than two subsamples left gives the
+    correction with all of them.
+
+    Returns a DataFrame with the corrected `values` (with all subsamples),
+    and the root-mean-square difference ("rmse") and standard deviation
+    ("std") of the bootstrapped corrected values for each row.
+    """
+    times = to_ns(times)
+    values = np.asarray(values, dtype=float)
+    sign = np.asarray(sign)
+    reference = drift_correction(times, sample_times, offsets, sign)
+    if reference is None:
+        raise ValueError("Fewer than two subsamples with a finite offset")
+
+    # Subsamples sorted by time, those with a non-finite offset never selected
+    sample_times = to_ns(sample_times)
+    order = np.argsort(sample_times, kind="stable")
+    knots = sample_times[order]
+    offsets = np.asarray(offsets, dtype=float)[order]
+    finite = np.isfinite(offsets)
+    keep = np.zeros(len(knots), dtype=bool)
+    if always_keep is not None:
+        keep = np.asarray(always_keep, dtype=bool)[order]
+    pool = np.flatnonzero(~keep)
+    n_keep = int(round((1 - fraction_to_omit) * len(pool)))
+    position = np.searchsorted(knots, times, side="right")
+
+    rng = np.random.default_rng(seed)
+    count = np.zeros(len(times))
+    total = np.zeros(len(times))
+    squares = np.zeros(len(times))
+    step = max(1, batch_size // max(1, len(times)))
+    for start in range(0, n_iterations, step):
+        n = min(step, n_iterations - start)
+        selected = np.tile(keep, (n, 1))
+        # The first n_keep of a random permutation of the pool in each iteration
+        chosen = np.argsort(rng.random((n, len(pool))), axis=1)[:, :n_keep]
+        selected[np.arange(n)[:, np.newaxis], pool[chosen]] = True
+        selected &= finite
+        corrections = _batch_corrections(
+            times, position, knots, offsets, selected, sign
+        )
+        corrections[selected.sum(axis=1) < 2] = reference
+        difference = corrections - reference
+        difference[:, np.isnan(values)] = np.nan
+        valid = np.isfinite(difference)
+        count += valid.sum(axis=0)
+        difference[~valid] = 0
+        total += difference.sum(axis=0)
+        squares += (difference**2).sum(axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rmse = np.sqrt(squares / count)
+        std = np.sqrt(((squares - total**2 / count) / (count - 1)).clip(0))
+    return pd.DataFrame(
+        {
+            "corrected": values + reference,
+            "rmse": rmse,
+            "std": np.where(count > 1, std, np.nan),
+        }
+    )
@@ -0,0 +1,117 @@
+import pandas as pd, numpy as np
+
+
+def uncertainty_budget(
+    function, inputs, uncertainties, options=None, n_joint=1000, lower=None, seed=None
+):
+    """Split the variance of `function` of `inputs` by source of uncertainty.
+
+    `inputs` maps the arguments of `function` to their values (one per sample),
+    `uncertainties` some of them to their 1-sigma uncertainty and `options`
+    some others to their possible choices, the first being the one used.
+    Every case is evaluated in a single call of `function`, with one row per
+    case: the inputs as they are, each input plus its uncertainty, each other
+    choice of each option, and `n_joint` random draws of all of them together.
+    `lower` maps some inputs to a lower bound (e.g. 0 for concentrations), at
+    which their draws are clipped.
+
+    Returns a DataFrame with one row per sample and, for each source, its
+    variance contribution, i.e. the squared change of the result for the
+    inputs, and the variance across the choices for the options.  "total" is
+    their sum and "joint" the variance of the joint draws, which only differs
+    from it if the sources interact or `function` is not linear enough.
+    """
+    options = options or {}
+    lower = lower or {}
+    rng = np.random.default_rng(seed)
+    n_samples = max(np.size(values) for values in inputs.values())
+    sources = [name for name in uncertainties if uncertainties[name]]
+    alternatives = [
+        (name, choice) for name, choices in options.items() for choice in choices[1:]
+    ]
+    n_rows = 1 + len(sources) + len(alternatives) + n_joint
+    stacked = {
+        name: np.tile(
+            np.broadcast_to(np.asarray(values, dtype=float), (n_samples,)),
+            (n_rows, 1),
+        )
+        for name, values in inputs.items()
+    }
+    for name, choices in options.items():
+        stacked[name] = np.full((n_rows, n_samples), choices[0])
+
+    # One source changed in each row after the first
+    for row, name in enumerate(sources, start=1):
+        stacked[name][row] += uncertainties[name]
+    for row, (name, choice) in enumerate(alternatives, start=1 + len(sources)):
+        stacked[name][row] = choice
+
+    # All sources drawn together in the last rows
+    joint = slice(n_rows - n_joint, n_rows)
+    for name in sources:
+        stacked[name][joint] += rng.normal(0, uncertainties[name], (n_joint, n_samples))
+    for name, choices in options.items():
+        stacked[name][joint] = rng.choice(choices, (n_joint, 1))
+    for name, bound in lower.items():
+        np.maximum(stacked[name], bound, out=stacked[name])
+
+    results = np.asarray(function(**stacked))
+    budget = pd.DataFrame(
+        {
+            name: (results[row] - results[0]) ** 2
+            for row, name in enumerate(sources, start=1)
+        }
+    )
+    for name in options:
+        rows = [0] + [
+            row
+            for row, (option, _) in enumerate(alternatives, start=1 + len(sources))
+            if option == name
+        ]
+        budget[name] = np.var(results[rows], axis=0)
+    budget["total"] = budget.sum(axis=1)
+    if n_joint:
+        budget["joint"] = np.var(results[joint], axis=0)
+    return budget
+
+
+def pH_uncertainty_budget(
+    alkalinity,
+    dic,
+    salinity,
+    temperature,
+    uncertainties,
+    total_silicate=0,
+    total_phosphate=0,
+    opt_k_carbonic=(10, 16),
+    n_joint=1000,
+    seed=None,
+):
+    """Split the variance of pH calculated from TA and DIC by source of
+    uncertainty (see uncertainty_budget).
+
+    `uncertainties` maps any of alkalinity, dic, salinity, temperature,
+    total_silicate and total_phosphate to their 1-sigma uncertainty, and the
+    carbonic acid constants are chosen from `opt_k_carbonic`.  The draws of
+    the nutrients are clipped at zero, as they are often zero themselves.
+    """
+    # Imported here so that uncertainty_budget does not need PyCO2SYS
+    from .montecarlo import ph_from_ta_dic
+
+    inputs = {
+        "alkalinity": alkalinity,
+        "dic": dic,
+        "salinity": salinity,
+        "temperature": temperature,
+        "total_silicate": total_silicate,
+        "total_phosphate": total_phosphate,
+    }
+    return uncertainty_budget(
+        ph_from_ta_dic,
+        inputs,
+        uncertainties,
+        {"opt_k_carbonic": opt_k_carbonic},
+        n_joint,
+        {"total_silicate": 0, "total_phosphate": 0},
+        seed,
+    )
@@ -0,0 +1,954 @@
+import datetime, os, time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd, numpy as np
+import matplotlib
+from matplotlib import pyplot as plt
+import matplotlib.dates as mdates
+from matplotlib.lines import Line2D
+from . import intermediates
+from .timealign import match_nearest
+
+# The figures are rendered from the files written by the processing scripts, so
+# that the data can be reprocessed without them (see A20_plot_figures.py)
+
+
+# === A03
+def dic_drift(df, day):
+    """Plot initial and drift-corrected DIC for one analysis day."""
+    # Create a column with hours and minutes
+    df["analysis_datetime"] = pd.to_datetime(df["analysis_datetime"])
+    df["datetime_for_plotting_only"] = df["analysis_datetime"].dt.strftime("%H:%M")
+    df["datetime_for_plotting_only"] = pd.to_datetime(
+        df["datetime_for_plotting_only"], format="%H:%M"
+    )
+
+    # Create figure
+    fig, ax = plt.subplots(dpi=300, figsize=(6, 4))
+
+    # Scatter original DIC
+    ax.scatter(
+        x="datetime_for_plotting_only", y="dic", data=df, alpha=0.3, label="Initial"
+    )
+
+    # Scatter corrected DIC
+    ax.scatter(
+        x="datetime_for_plotting_only",
+        y="dic_corrected",
+        data=df,
+        alpha=0.3,
+        label="Corrected",
+    )
+
+    # Improve plot
+    myFmt = mdates.DateFormatter("%H")
+    ax.xaxis.set_major_formatter(myFmt)
+
+    ax.grid(alpha=0.3)
+    ax.set_xlabel("Time / hrs")
+    ax.set_ylabel("$DIC$ / μmol · $kg^{-1}$")
+
+    ax.set_title(day)
+
+    ax.legend()
+    plt.tight_layout()
+    return fig
+
+
+def dic_drift_all(df):
+    """Plot initial and drift-corrected DIC for all samples."""
+    # Create a column with hours and minutes
+    df["analysis_datetime"] = pd.to_datetime(df["analysis_datetime"])
+    df["datetime_for_plotting_only"] = df["analysis_datetime"].dt.strftime("%H:%M")
+    df["datetime_for_plotting_only"] = pd.to_datetime(
+        df["datetime_for_plotting_only"], format="%H:%M"
+    )
+
+    # Create figure
+    fig, ax = plt.subplots(dpi=300, figsize=(6, 4))
+
+    L = df["dic_corrected"].notnull()
+
+    # Scatter original DIC
+    ax.scatter(
+        x="datetime_for_plotting_only", y="dic", data=df[L], alpha=0.3, label="Initial"
+    )
+
+    # Scatter corrected DIC
+    ax.scatter(
+        x="datetime_for_plotting_only",
+        y="dic_corrected",
+        data=df[L],
+        alpha=0.3,
+        label="Corrected",
+    )
+
+    # Improve plot
+    myFmt = mdates.DateFormatter("%H")
+    ax.xaxis.set_major_formatter(myFmt)
+
+    ax.grid(alpha=0.3)
+    ax.set_xlabel("Time / hrs")
+    ax.set_ylabel("$DIC$ / μmol · $kg^{-1}$")
+
+    ax.legend()
+    plt.tight_layout()
+    return fig
+
+
+# === OPTODE
+def _set_cruise_dates(fig, ax):
+    """Format the x-axis of a time series over the whole cruise."""
+    ax.set_xlabel("Date")
+    ax.xaxis.set_major_locator(mdates.AutoDateLocator())
+    ax.xaxis.set_major_formatter(mdates.DateFormatter("%Y-%m-%d"))
+    ax.tick_params(axis="both", which="major")
+    fig.autofmt_xdate()
+    ax.grid(alpha=0.3)
+
+    start_date = mdates.date2num(datetime.datetime.strptime("2022-02-22", "%Y-%m-%d"))
+    end_date = mdates.date2num(datetime.datetime.strptime("2022-04-06", "%Y-%m-%d"))
+
+    # Set the x-axis limits
+    ax.set_xlim(start_date, end_date)
+
+
+def remove_bad_pH(raw, df):
+    """Plot the pH data removed by A08."""
+    # Create figure
+    fig, ax = plt.subplots(dpi=300, figsize=(6, 4))
+
+    # Plot good pH data
+    ax.scatter(
+        mdates.date2num(df["date_time"]),
+        df["pH"],
+        s=1,
+        alpha=0.4,
+        c="black",
+        label="Filtered pH",
+        edgecolor="none",
+        zorder=2,
+    )
+
+    # Plot bad pH data
+    ax.scatter(
+        mdates.date2num(raw["date_time"]),
+        raw["pH"],
+        s=1,
+        alpha=0.4,
+        c="red",
+        label="Raw pH",
+        edgecolor="none",
+        zorder=1,
+    )
+
+    # Improve figure
+    ax.set_title(
+        "Removal of unrealistic pH data points due to optode stabilization", fontsize=10
+    )
+    ax.set_ylabel("$pH_{total}$")
+    _set_cruise_dates(fig, ax)
+
+    # Add legend
+    ax.legend(loc="lower right", fontsize=10, markerscale=5)
+    plt.tight_layout()
+    return fig
+
+
+def correct_pH(df, subsamples):
+    """Plot the pH time series before and after the A10 correction."""
+    # Create figure
+    fig, ax = plt.subplots(dpi=300, figsize=(6, 4))
+
+    # Plot raw pH data
+    ax.scatter(
+        df["date_time"],
+        df["pH_insitu_ta_est"],
+        label="Raw pH",
+        color="blue",
+        s=1,
+        alpha=0.6,
+    )
+
+    # Plot corrected pH data
+    ax.scatter(
+        df["date_time"],
+        df["pH_optode_corrected"],
+        label="Corrected pH",
+        color="black",
+        s=1,
+        alpha=0.4,
+    )
+
+    # Scatter the subsamples for corrected pH
+    ax.scatter(
+        subsamples["date_time"],
+        subsamples["pH_total_est_TA_DIC"],
+        label="Subsample $pH_{TA/DIC}$",
+        color="red",
+        s=3,
+        marker="x",  # use different marker for clarity
+        zorder=5,  # to ensure it's on top
+    )
+
+    ax.set_title(
+        "Correction of pH time series based on recalculated pH from TA and DIC",
+        fontsize=10,
+    )
+    ax.set_ylabel("$pH_{total}$")
+    _set_cruise_dates(fig, ax)
+
+    # Add legend
+    ax.legend(loc="best", fontsize=10, markerscale=5)
+    plt.tight_layout()
+    return fig
+
+
+def temperature_sources(df):
+    """Plot the PyroScience pt-100 and the SMB in-situ temperatures."""
+    # Create figure
+    fig, ax = plt.subplots(dpi=300, figsize=(6, 4))
+
+    # Plot pt-100 temperature
+    ax.scatter(
+        df["date_time"],
+        df["temp_cell"],
+        label="pt-100 sensor",
+        color="blue",
+        s=1,
+        alpha=0.6,
+    )
+
+    # Plot in-situ temperature
+    ax.scatter(
+        df["date_time"],
+        df["SBE38_water_temp"],
+        label="In-situ temperature",
+        color="black",
+        s=1,
+        alpha=0.4,
+    )
+
+    ax.set_title(
+        "Comparison of pt-100 temperature sensor and in-situ temperature", fontsize=10
+    )
+    ax.set_ylabel("Temperature (°C)")
+    _set_cruise_dates(fig, ax)
+
+    # Add legend
+    ax.legend(loc="best", fontsize=10, markerscale=5)
+    plt.tight_layout()
+    return fig
+
+
+# === A17
+def _moving_average(df):
+    """Compute the simple moving average (SMA) over a period of 30 minutes."""
+    df["SMA"] = df["pH_corrected"].rolling(60, min_periods=1).mean()
+    df["SMA_uncertainty"] = df["pH_uncertainty"].rolling(60, min_periods=1).mean()
+    return df
+
+
+def _decorate_broken_axes(bax):
+    """Create empty right and top axes around a broken axes plot."""
+    bax2 = bax.twinx()[0]  # Get the first axes object from the list
+    bax3 = bax.twiny()[0]  # Get the first axes object from the list
+
+    bax2.set_ylabel("")
+    bax3.set_xlabel("")
+
+    bax2.set_yticks([])
+    bax3.set_xticks([])
+
+    bax2.set_yticklabels([])
+    bax3.set_xticklabels([])
+
+
+def pH_correction_with_uncertainty(df, subsamples):
+    """Plot the corrected pH with its bootstrapped uncertainty (A17_C)."""
+    from brokenaxes import brokenaxes
+
+    df = _moving_average(df)
+
+    # Create broken axes plot with adjusted spacing
+    fig = plt.figure(figsize=(6, 4), dpi=300)
+
+    # Define start and end of the xaxis break
+    start_break = datetime.datetime(2022, 3, 6)
+    end_break = datetime.datetime(2022, 3, 29)
+
+    # Set the limits for the left side of the broken x-axis
+    L = (df["SMA"].notnull()) & (df["date_time"] > datetime.datetime(2022, 3, 1, 15))
+    left_xlim = (df["date_time"][L].min(), start_break)
+
+    # Set the limits for the right side of the broken x-axis
+    right_xlim = (end_break, df["date_time"][L].max())
+
+    # Create broken axes plot with adjusted spacing and separate x-axis limits
+    bax = brokenaxes(
+        xlims=(left_xlim, right_xlim),
+        hspace=0.05,
+        d=0,
+        width_ratios=[2, 1],
+        wspace=0.05,
+    )
+
+    # Plot the stuff we're interested in
+    L = df["SMA"].notnull()
+    bax.scatter(
+        df["date_time"][L],
+        df["pH_insitu_ta_est"][L],
+        s=0.1,
+        label="Uncorrected pH",
+        color="xkcd:light pink",
+        alpha=0.6,
+    )
+    bax.scatter(
+        df["date_time"][L],
+        df["SMA"][L],
+        s=0.1,
+        label="Corrected pH",
+        color="b",
+        alpha=0.6,
+    )
+    bax.fill_between(
+        df["date_time"][L],
+        df["SMA"][L] - df["SMA_uncertainty"][L],
+        df["SMA"][L] + df["SMA_uncertainty"][L],
+        color="b",
+        alpha=0.2,
+    )
+    bax.scatter(
+        subsamples["date_time"],
+        subsamples["pH_total_est_TA_DIC"],
+        color="k",
+        label="Subsamples $pH_{TA/DIC}$",
+        s=20,
+        alpha=0.6,
+        edgecolor="k",
+        zorder=6,
+    )
+
+    # Draw vertical lines at the break points
+    bax.axvline(start_break, color="k", linewidth=1.2)
+    bax.axvline(end_break, color="k", linewidth=1.2)
+
+    _decorate_broken_axes(bax)
+
+    # Remove the label of the first date after the break
+    for ax in bax.axs:
+        labels = ax.get_xticklabels()
+        new_labels = [
+            label if label.get_text() != "2022-03-29" else "" for label in labels
+        ]
+        ax.set_xticklabels(new_labels)
+
+    # Add a legend with larger markers for the time series
+    handles, labels = ax.get_legend_handles_labels()
+    custom_handles = [
+        Line2D(
+            [0],
+            [0],
+            marker="o",
+            color="w",
+            label="Uncorrected pH",
+            markersize=6,
+            markerfacecolor="xkcd:light pink",
+        ),
+        Line2D(
+            [0],
+            [0],
+            marker="o",
+            color="w",
+            label="Corrected pH",
+            markersize=6,
+            markerfacecolor="b",
+        ),
+    ] + handles[2:]
+    bax.legend(handles=custom_handles, loc="upper left")
+
+    # Improve plot
+    bax.set_ylabel("$pH_{total}$")
+    bax.set_ylim(7.9, 8.15)
+    bax.grid(alpha=0.3)
+    fig.autofmt_xdate()
+    return fig
+
+
+def compare_pH_uncertainty(df, check):
+    """Compare the A17_C pH uncertainty with bootstrapping only (A17_D)."""
+    from brokenaxes import brokenaxes
+
+    # Define start and end of the x-axis break
+    start_break = datetime.datetime(2022, 3, 6)
+    end_break = datetime.datetime(2022, 3, 29)
+
+    # Create broken axes plot with adjusted spacing
+    fig = plt.figure(figsize=(10, 6), dpi=300)
+    bax = brokenaxes(
+        xlims=[
+            (df["date_time"].min(), start_break),
+            (end_break, df["date_time"].max()),
+        ],
+        d=0.05,  # Spacing between the broken parts
+        wspace=0.05,  # Width ratio between broken parts
+        despine=False,  # Hide the top and right frame lines
+    )
+
+    # Plot the pH uncertainty from both approaches
+    bax.scatter(
+        df["date_time"],
+        df["pH_uncertainty"],
+        color="blue",
+        label="New pH Uncertainty",
+        s=2,
+        alpha=0.6,
+    )
+    bax.scatter(
+        check["date_time"],
+        check["pH_uncertainty"],
+        color="red",
+        label="Old pH Uncertainty",
+        s=2,
+        alpha=0.6,
+    )
+
+    # Formatting
+    bax.set_xlabel("Date Time")
+    bax.set_ylabel("pH Uncertainty")
+    bax.legend(loc="upper right")
+    bax.grid(True)
+
+    # Draw vertical lines at the break points to indicate the break in the plot
+    bax.axvline(x=start_break, color="gray", linestyle="--")
+    bax.axvline(x=end_break, color="gray", linestyle="--")
+
+    fig.autofmt_xdate()
+    return fig
+
+
+def _south_pacific(df, start_break, end_break, **kwargs):
+    """Plot the corrected South Pacific pH on broken axes (A17_D)."""
+    from brokenaxes import brokenaxes
+
+    # Set the limits for the left side of the broken x-axis
+    L = (df["SMA"].notnull()) & (df["date_time"] > pd.Timestamp(2022, 3, 1, 15))
+    left_xlim = (df["date_time"][L].min(), start_break)
+
+    # Set the limits for the right side of the broken x-axis
+    right_xlim = (end_break, df["date_time"][L].max())
+
+    # Create broken axes plot with adjusted spacing and separate x-axis limits
+    bax = brokenaxes(
+        xlims=(left_xlim, right_xlim),
+        hspace=0.05,
+        d=0,
+        width_ratios=[1, 2],
+        wspace=0.05,
+        **kwargs,
+    )
+
+    # Plot the stuff we're interested in
+    L = df["SMA"].notnull()
+    bax.scatter(
+        df["date_time"][L],
+        df["pH_insitu_ta_est"][L],
+        s=0.1,
+        label="Uncorrected pH",
+        color="xkcd:light pink",
+        alpha=0.6,
+    )
+    bax.scatter(
+        df["date_time"][L],
+        df["SMA"][L],
+        s=0.1,
+        label="Corrected pH",
+        color="b",
+        alpha=0.6,
+    )
+    bax.fill_between(
+        df["date_time"][L],
+        df["SMA"][L] - df["SMA_uncertainty"][L],
+        df["SMA"][L] + df["SMA_uncertainty"][L],
+        color="b",
+        alpha=0.2,
+    )
+    return bax
+
+
+def _plot_subsamples(bax, subsamples, start_break, end_break):
+    """Scatter the subsamples that do not fall within the x-axis break."""
+    mask = (subsamples["date_time"] < start_break) | (
+        subsamples["date_time"] >= end_break
+    )
+    filtered_subsamples = subsamples[mask]
+    bax.scatter(
+        filtered_subsamples["date_time"],
+        filtered_subsamples["pH_total_est_TA_DIC"],
+        color="k",
+        label="Subsamples $pH_{TA/DIC}$",
+        s=20,
+        alpha=0.6,
+        edgecolor="k",
+        zorder=6,
+    )
+
+    # Draw vertical lines at the break points
+    bax.axvline(start_break, color="k", linewidth=1.2)
+    bax.axvline(end_break, color="k", linewidth=1.2)
+
+
+def _pH_legend(bax):
+    """Add a legend below broken axes, with larger markers for the time series."""
+    handles, labels = bax.get_legend_handles_labels()
+    custom_handles = [
+        Line2D(
+            [0],
+            [0],
+            marker="o",
+            color="w",
+            label="Uncorrected pH",
+            markersize=6,
+            markerfacecolor="xkcd:light pink",
+        ),
+        Line2D(
+            [0],
+            [0],
+            marker="o",
+            color="w",
+            label="Corrected pH",
+            markersize=6,
+            markerfacecolor="b",
+        ),
+        Line2D(
+            [0],
+            [0],
+            marker="o",
+            color="w",
+            label="Subsamples $pH_{TA/DIC}$",
+            markersize=6,
+            markerfacecolor="k",
+        ),
+    ] + list(handles[2:])
+    bax.legend(
+        handles=custom_handles,
+        loc="upper center",
+        bbox_to_anchor=(0.5, -0.3),
+        ncol=3,
+        fontsize=8,
+    )
+
+
+def pH_correction_south_pacific(df, subsamples):
+    """Plot the bootstrapped pH correction in the South Pacific (A17_D)."""
+    df = _moving_average(df)
+    fig = plt.figure(figsize=(6, 4), dpi=300)
+
+    # Define start and end of the x-axis break
+    start_break = pd.Timestamp(2022, 3, 6)
+    end_break = pd.Timestamp(2022, 3, 24)
+
+    bax = _south_pacific(df, start_break, end_break)
+    _plot_subsamples(bax, subsamples, start_break, end_break)
+    _decorate_broken_axes(bax)
+
+    # Remove the label of the last date before the break
+    for ax in bax.axs:
+        labels = ax.get_xticklabels()
+        new_labels = [
+            label.get_text() if label.get_text() != "2022-03-23" else ""
+            for label in labels
+        ]
+        ax.set_xticklabels(new_labels)
+
+    _pH_legend(bax)
+
+    # Improve plot
+    bax.set_ylabel("$pH_{total}$")
+    bax.set_ylim(7.9, 8.15)
+    bax.grid(alpha=0.3)
+    fig.autofmt_xdate()
+    return fig
+
+
+def atlantic_pacific_corrections(df, subsamples, atlantic, atlantic_subsamples, geomar):
+    """Compare the pH corrections of the Atlantic and South Pacific cruises."""
+    from matplotlib import gridspec
+
+    df = _moving_average(df)
+
+    # Convert date columns to datetime if they're not already
+    atlantic["date_time"] = pd.to_datetime(atlantic["date_time"])
+    atlantic_subsamples["date_time"] = pd.to_datetime(atlantic_subsamples["date_time"])
+
+    # Set up the figure and gridspec
+    fig = plt.figure(figsize=(6, 10), dpi=300)
+    gs = gridspec.GridSpec(2, 1, height_ratios=[1, 1])
+
+    # === FIRST SUBPLOT
+    # Compute simple moving average (SMA) over period of 30 minutes
+    atlantic["SMA"] = atlantic["pH_optode_corrected"].rolling(60, min_periods=1).mean()
+    atlantic["SMA_uncertainty"] = (
+        atlantic["pH_optode_corrected_RMSE"].rolling(60, min_periods=1).mean()
+    )
+
+    # Subplot for new Atlantic cruise (standard axis)
+    ax1 = fig.add_subplot(gs[0, 0])
+    L = atlantic["SMA"].notnull()
+    ax1.scatter(
+        atlantic["date_time"][L],
+        atlantic["pH_insitu_ta_est"][L],
+        label="Uncorrected pH",
+        s=0.1,
+        color="xkcd:light pink",
+        alpha=0.6,
+    )
+    ax1.scatter(
+        atlantic["date_time"][L],
+        atlantic["SMA"][L],
+        label="Corrected pH",
+        s=0.1,
+        color="blue",
+        alpha=0.6,
+    )
+
+    # Plot the uncertainty separately for each continuous segment of data
+    gaps = atlantic["date_time"].diff() > pd.Timedelta(minutes=30)
+    for _, segment in atlantic.groupby(gaps.cumsum()):
+        ax1.fill_between(
+            segment["date_time"],
+            segment["SMA"] - segment["SMA_uncertainty"],
+            segment["SMA"] + segment["SMA_uncertainty"],
+            color="blue",
+            alpha=0.2,
+        )
+
+    ax1.scatter(
+        atlantic_subsamples["date_time"],
+        atlantic_subsamples["pH_initial_talk_corr"],
+        color="k",
+        label="Subsamples $pH_{TA/DIC}$",
+        s=20,
+        alpha=0.6,
+        edgecolor="k",
+        zorder=6,
+    )
+
+    ax1.set_ylabel("$\\mathrm{pH_{total}}$")
+
+    ax1.set_xlim(atlantic["date_time"].min(), atlantic["date_time"].max())
+    ax1.set_ylim(8.04, 8.20)
+
+    # Format the x-axis to show dates
+    ax1.xaxis.set_major_locator(mdates.AutoDateLocator())
+    ax1.xaxis.set_major_formatter(mdates.DateFormatter("%Y-%m-%d"))
+    plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45, ha="right")
+
+    ax1.grid(True, alpha=0.3)
+
+    # Adjust the subplot to prevent overlap
+    plt.tight_layout(rect=[0, 0, 1, 0.95])
+
+    # Add label (a) to the first subplot
+    ax1.text(0, 1.08, "a)", transform=ax1.transAxes, verticalalignment="top")
+
+    # === SECOND SUBPLOT
+    # Define start and end of the x-axis break for the original cruise
+    start_break = pd.Timestamp(2022, 3, 6)
+    end_break = pd.Timestamp(2022, 3, 24)
+
+    bax = _south_pacific(df, start_break, end_break, subplot_spec=gs[1, 0])
+
+    # GEOMAR pH data (SAMI)
+    geomar["datetime"] = pd.to_datetime(geomar["datetime"])
+    geomar["SMA"] = geomar["pH_meas"].rolling(60, min_periods=1).mean()
+    geomar["SMA_uncertainty"] = geomar["pH_meas_unc"].rolling(60, min_periods=1).mean()
+    bax.scatter(
+        geomar["datetime"],
+        geomar["SMA"],
+        s=0.1,
+        label="Independent pH (SAMI)",
+        color="k",
+        alpha=0.6,
+    )
+    bax.fill_between(
+        geomar["datetime"],
+        geomar["SMA"] - geomar["SMA_uncertainty"],
+        geomar["SMA"] + geomar["SMA_uncertainty"],
+        color="k",
+        alpha=0.2,
+    )
+
+    _plot_subsamples(bax, subsamples, start_break, end_break)
+    _decorate_broken_axes(bax)
+
+    # Rotate the date labels and remove the label of the first date after the break
+    for ax in bax.axs:
+        plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha="right")
+    for ax in bax.axs:
+        labels = ax.get_xticklabels()
+        new_labels = [
+            label.get_text() if label.get_text() != "2022-03-24" else ""
+            for label in labels
+        ]
+        ax.set_xticklabels(new_labels)
+
+    # Add label (b) to the second subplot
+    bax.axs[0].text(
+        0, 1.08, "b)", transform=bax.axs[0].transAxes, verticalalignment="top"
+    )
+
+    _pH_legend(bax)
+
+    bax.set_ylabel("$\\mathrm{pH_{total}}$")
+    bax.set_ylim(7.9, 8.15)
+    bax.grid(alpha=0.3)
+
+    plt.tight_layout(rect=[0, 0, 1, 0.95])
+    return fig
+
+
+def geomar_vs_south_pacific(df, geomar):
+    """Compare the corrected optode pH with the GEOMAR SAMI pH."""
+    from sklearn.metrics import mean_squared_error
+
+    geomar["datetime"] = pd.to_datetime(geomar["datetime"])
+    geomar = geomar.sort_values("datetime")
+
+    # Match GEOMAR pH (SAMI) with closest South Pacific cruise pH (raw values)
+    geomar = geomar[["datetime", "pH_meas", "pH_meas_unc"]]
+    matched = geomar.join(
+        match_nearest(
+            geomar,
+            df,
+            ["date_time", "pH_corrected", "pH_uncertainty"],
+            tolerance=pd.Timedelta(minutes=1),  # Max allowed time difference
+            on="datetime",
+            other_on="date_time",
+        )
+    )
+
+    # Drop unmatched rows
+    matched = matched.dropna()
+
+    # Calculate RMSD
+    rmsd = np.sqrt(mean_squared_error(matched["pH_meas"], matched["pH_corrected"]))
+
+    # Create figure and axis
+    fig, ax = plt.subplots(figsize=(5, 5), dpi=300)
+
+    # Scatter plot with error bars
+    ax.errorbar(
+        matched["pH_corrected"],
+        matched["pH_meas"],
+        xerr=matched["pH_uncertainty"],
+        yerr=matched["pH_meas_unc"],
+        fmt="o",
+        markersize=3,
+        elinewidth=0.5,
+        capsize=1.5,
+        alpha=0.5,
+        markerfacecolor="none",
+        markeredgecolor="k",
+        ecolor="k",
+    )
+
+    # 1:1 line
+    min_val = 7.9
+    max_val = 8.2
+    ax.plot([min_val, max_val], [min_val, max_val], "k--", label="1:1 Line")
+
+    # Labels and styling
+    ax.set_xlabel("pH$_{optode}$")
+    ax.set_ylabel("pH$_{SAMI}$")
+
+    ax.grid(True, alpha=0.3)
+
+    # Annotate RMSD
+    ax.text(
+        0.02,
+        0.98,
+        f"RMSD = {rmsd:.4f}",
+        transform=ax.transAxes,
+        verticalalignment="top",
+        fontsize=10,
+        bbox=dict(facecolor="white", edgecolor="gray", boxstyle="round"),
+    )
+
+    # Set limits
+    ax.set_xlim(7.9, 8.2)
+    ax.set_ylim(7.9, 8.2)
+
+    fig.tight_layout()
+    return fig
+
+
+# Each figure is drawn by `function` from its input files and saved to `output`.
+# With `each`, one figure is drawn per value of that column of the first input,
+# which is then passed to `function` after the DataFrames.
+Figure = namedtuple(
+    "Figure",
+    ["name", "function", "inputs", "output", "each", "savefig"],
+    defaults=[None, {}],
+)
+
+A03_OUTPUT = "data/processing/vindta/A03_correct_VINDTA_DIC_drift.csv"
+A17_C_OUTPUT = "data/processing/optode/A17_uws_correct_pH_bootstrapping_subsaomples_uncertainty.csv"
+A17_C_SUBSAMPLES = "data/processing/optode/A17_uws_correct_pH_bootstrapping_subsaomples_uncertainty_subsamples.csv"
+A17_D_OUTPUT = "data/processing/optode/A17_uws_correct_pH_bootstrapping.csv"
+A17_D_SUBSAMPLES = (
+    "data/processing/optode/A17_uws_correct_pH_bootstrapping_subsamples.csv"
+)
+GEOMAR = "data/SO289 carbonate data-Li Qiu-update_LD.xlsx"
+
+FIGURES = [
+    Figure(
+        "A03_correct_DIC_drift",
+        dic_drift,
+        [A03_OUTPUT],
+        "figs/vindta/drift_correction/correct_DIC_drift_{}.png",
+        each="dic_cell_id",
+    ),
+    Figure(
+        "A03_correct_DIC_drift_all",
+        dic_drift_all,
+        [A03_OUTPUT],
+        "figs/vindta/drift_correction/correct_DIC_drift_all.png",
+    ),
+    Figure(
+        "A08_remove_bad_pH",
+        remove_bad_pH,
+        [
+            "data/processing/optode/A07_uws_match_pyroscience_smb.csv",
+            "data/processing/optode/A08_remove_bad_pH.csv",
+        ],
+        "figs/A08_remove_bad_pH.png",
+    ),
+    Figure(
+        "A10_uws_correct_pH",
+        correct_pH,
+        [
+            "data/processing/optode/A10_uws_correct_pH.csv",
+            "data/processing/optode/A10_uws_correct_pH_subsamples.csv",
+        ],
+        "figs/A10_uws_correct_pH.png",
+    ),
+    Figure(
+        "A16_check_temperature_sources",
+        temperature_sources,
+        ["data/processing/optode/A10_uws_correct_pH.csv"],
+        "figs/A16_check_temperature_sources.png",
+    ),
+    Figure(
+        "A17_pH_correction_with_uncertainty",
+        pH_correction_with_uncertainty,
+        [A17_C_OUTPUT, A17_C_SUBSAMPLES],
+        "figs/SO289_pH_correction_with_uncertainty.png",
+    ),
+    Figure(
+        "A17_compare_pH_uncertainty",
+        compare_pH_uncertainty,
+        [A17_C_OUTPUT, A17_D_OUTPUT],
+        "figs/A17_compare_pH_uncertainty.png",
+    ),
+    Figure(
+        "A17_pH_correction_south_pacific",
+        pH_correction_south_pacific,
+        [A17_D_OUTPUT, A17_D_SUBSAMPLES],
+        "figs/SO289_pH_correction_south_pacific.png",
+    ),
+    Figure(
+        "A17_atlantic_pacific_corrections",
+        atlantic_pacific_corrections,
+        [
+            A17_D_OUTPUT,
+            A17_D_SUBSAMPLES,
+            "data/PLOTTING_processed_uws_data_with_uncertainty_bootstrapping.csv",
+            "data/PLOTTING_subsamples_with_corrections.csv",
+            GEOMAR,
+        ],
+        "figs/atlantic_pacific_corrections.png",
+        savefig={"bbox_inches": "tight"},
+    ),
+    Figure(
+        "A17_geomar_vs_south_pacific",
+        geomar_vs_south_pacific,
+        [A17_D_OUTPUT, GEOMAR],
+        "figs/geomar_vs_south_pacific_raw.png",
+    ),
+]
+
+
+def _read_input(path):
+    """Read an input file of a figure."""
+    if path.endswith(".xlsx"):
+        return pd.read_excel(path)
+    return intermediates.read_intermediate(path)
+
+
+def _use_agg():
+    """Render figures without a display."""
+    matplotlib.use("Agg")
+
+
+def _render(figure, dfs, value=None):
+    """Draw and save one figure, and return its file path."""
+    # The functions add columns to their DataFrames
+    args = [df.copy() for df in dfs]
+    if figure.each is None:
+        output = figure.output
+    else:
+        output = figure.output.format(value)
+        args.append(value)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    fig = figure.function(*args)
+    fig.savefig(output, dpi=300, **figure.savefig)
+    plt.close(fig)
+    return output
+
+
+def render_figures(names=None, max_workers=1):
+    """Render figures from the files written by the processing scripts.
+
+    The figures are rendered with the Agg backend, one after the other or in a
+    pool of `max_workers` processes (None for one per CPU), which must then be
+    started from code under if __name__ == "__main__": (see get_pool_workers).
+    Figures whose input files do not exist are skipped.
+    """
+    figures = FIGURES if names is None else [f for f in FIGURES if f.name in names]
+    start = time.perf_counter()
+
+    # Read each input file once, and split the figures into tasks
+    data = {}
+    tasks = []
+    for figure in figures:
+        missing = [
+            path
+            for path in figure.inputs
+            if not intermediates.intermediate_exists(path)
+        ]
+        if missing:
+            print("Skipping {}: missing {}".format(figure.name, ", ".join(missing)))
+            continue
+        for path in figure.inputs:
+            if path not in data:
+                data[path] = _read_input(path)
+        dfs = [data[path] for path in figure.inputs]
+        if figure.each is None:
+            tasks.append((figure, dfs, None))
+        else:
+            for value, group in dfs[0].groupby(figure.each, observed=True):
+                tasks.append((figure, [group] + dfs[1:], value))
+
+    if max_workers == 1 or len(tasks) <= 1:
+        _use_agg()
+        outputs = [_render(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers, initializer=_use_agg) as executor:
+            outputs = list(executor.map(_render, *zip(*tasks)))
+    print(
+        "Rendered {} figures in {:.1f} s".format(
+            len(outputs), time.perf_counter() - start
+        )
+    )
+    return outputs
@@ -0,0 +1,32 @@
+import pandas as pd, numpy as np
+
+# Degrees, minutes, seconds and direction, separated by °, ., ' or ", as in
+# "32° 29.726' S" (spaces are removed first)
+_separator = "[°.'\"]"
+_part = "([^°.'\"]*)"
+_dms = "^{0}{1}{0}{1}{0}{1}{0}$".format(_part, _separator)
+
+
+def dms_to_dd(lat_or_lon):
+    """Convert a column of coordinates from degrees to decimals.
+
+    Values that cannot be converted are set to NaN and reported, instead of
+    raising an error.
+    """
+    parts = lat_or_lon.str.replace(" ", "", regex=False).str.extract(_dms)
+    deg, minutes, seconds = [
+        pd.to_numeric(parts[i], errors="coerce").astype(float) for i in range(3)
+    ]
+    # The digits after the "." are counted as seconds, not as decimal minutes,
+    # as in the published data files
+    ans = ((deg + minutes / 60) + seconds / (60 * 60)) * np.where(
+        parts[3].isin(["W", "S"]), -1, 1
+    )
+    bad = ans.isnull() & lat_or_lon.notnull()
+    if bad.any():
+        print(
+            "Could not convert {} coordinates to decimals, e.g. {!r} (row {})".format(
+                bad.sum(), lat_or_lon[bad].iloc[0], lat_or_lon[bad].index[0]
+            )
+        )
+    return ans.rename(lat_or_lon.name)
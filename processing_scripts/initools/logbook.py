@@ -1,8 +1,10 @@
 import pandas as pd
+from ..profiling import profiled
 
 # from data_processing import read_pyrosci
 
 
+@profiled
 def logbook(data_dict, file_list):
     """Apply logbook notes from cruise SO279 to Pyroscience DataFrame."""
 
@@ -10,16 +12,16 @@ def logbook(data_dict, file_list):
     for file in file_list:
         L = data_dict[file].sec > 1200
         data_dict[file] = data_dict[file][L]
-        data_dict[file]["date_time"] = pd.to_datetime(
-            data_dict[file].date_time, format="%d-%m-%Y %H:%M:%S.%f"
-        )
 
     # turn dict into single df
     data = pd.concat(data_dict.values(), ignore_index=True)
 
+    # categoricals with different categories in each file are concatenated as
+    # objects
+    for column in ["filename", "status_ph", "status_temp"]:
+        data[column] = data[column].astype("category")
+
     # drop ms
-    data["date_time"] = data["date_time"].apply(
-        lambda x: x.strftime("%d-%m-%Y %H:%M:%S")
-    )
+    data["date_time"] = data["date_time"].dt.floor("s")
 
     return data
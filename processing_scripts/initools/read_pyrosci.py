@@ -1,60 +1,141 @@
 import pandas as pd
-import os
+import hashlib, os, pickle
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from ..profiling import profiled
 
+rn = {
+    "Date [A Ch.1 Main]": "date",
+    "Time [A Ch.1 Main]": "time",
+    " dt (s) [A Ch.1 Main]": "sec",
+    "pH [A Ch.1 Main]": "pH_cell",
+    "Sample Temp. (°C) [A Ch.1 CompT]": "temp_cell",
+    "dphi (°) [A Ch.1 Main]": "dphi",
+    "Signal Intensity (mV) [A Ch.1 Main]": "signal_intensity",
+    "Ambient Light (mV) [A Ch.1 Main]": "ambient_light",
+    "ldev (nm) [A Ch.1 Main]": "ldev",
+    "Status [A Ch.1 Main]": "status_ph",
+    "Status [A Ch.1 CompT]": "status_temp",
+}
 
-def read_pyrosci(datasheet_filepath, txt_filepath):
+# Only the columns in rn are read, with these compact dtypes
+dtypes = {
+    "dphi (°) [A Ch.1 Main]": "float32",
+    "Signal Intensity (mV) [A Ch.1 Main]": "float32",
+    "Ambient Light (mV) [A Ch.1 Main]": "float32",
+    "ldev (nm) [A Ch.1 Main]": "float32",
+    "Status [A Ch.1 Main]": "category",
+    "Status [A Ch.1 CompT]": "category",
+}
+
+# Parsed files are cached here, keyed by the path, size and modification time of
+# the .txt file (change CACHE_VERSION whenever _read_file returns something new)
+CACHE_DIR = "data/processing/.pyrosci_cache"
+CACHE_VERSION = 2
+
+
+def _cache_path(fname, cache_dir):
+    """Return the cache file of the current version of a PyroScience file."""
+    stat = os.stat(fname)
+    key = [CACHE_VERSION, os.path.abspath(fname), stat.st_size, stat.st_mtime_ns]
+    sha = hashlib.sha256(repr(key).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, "{}_{}.pkl".format(os.path.basename(fname), sha))
+
+
+def _read_cached(fname, file, cache_dir=None):
+    """Import one PyroScience text file, from the cache if it did not change."""
+    if cache_dir is None:
+        return _read_file(fname, file)
+    cache_file = _cache_path(fname, cache_dir)
+    if os.path.isfile(cache_file):
+        with open(cache_file, "rb") as f:
+            return pickle.load(f)
+    df = _read_file(fname, file)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Remove the entries of previous versions of the file
+    prefix = os.path.basename(fname) + "_"
+    for old in os.listdir(cache_dir):
+        if old.startswith(prefix) and len(old) == len(prefix) + 20:
+            os.remove(os.path.join(cache_dir, old))
+    # Write to a temporary file first, so that an interrupted run leaves no
+    # broken entry behind
+    with open(cache_file + ".tmp", "wb") as f:
+        pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(cache_file + ".tmp", cache_file)
+    return df
+
+
+def _read_file(fname, file):
+    """Import one PyroScience text file as a pandas DataFrame."""
+    df = pd.read_table(
+        fname,
+        skiprows=22,
+        encoding="unicode_escape",
+        usecols=list(rn),
+        dtype=dtypes,
+    )
+    df = df.rename(rn, axis=1)
+    df["filename"] = np.nan
+    df.filename = file
+    df["date_time"] = np.nan
+    df.date_time = df.date + " " + df.time
+    # Parsed once here, and kept as datetime64[ns] until the SMB is matched
+    df.date_time = pd.to_datetime(df.date_time, format="%d-%m-%Y %H:%M:%S.%f").astype(
+        "datetime64[ns]"
+    )
+
+    df.dropna()
+    return df[
+        [
+            "filename",
+            "date_time",
+            "sec",
+            "pH_cell",
+            "temp_cell",
+            "dphi",
+            "signal_intensity",
+            "ambient_light",
+            "ldev",
+            "status_ph",
+            "status_temp",
+        ]
+    ]
+
+
+@profiled
+def read_pyrosci(datasheet_filepath, txt_filepath, max_workers=1, cache_dir=CACHE_DIR):
     """Import the text files generated by PyroScience Workbench as a
-    pandas DataFrame."""
+    pandas DataFrame.
+
+    The files are read one after the other, or in a pool of `max_workers`
+    processes (None for one per CPU), which must then be started from code
+    under if __name__ == "__main__": (see get_pool_workers).  They are
+    returned sorted by file name whatever order they finish in.
+    Parsed files are cached in `cache_dir` (None to always parse them).
+    """
     db = pd.read_excel(datasheet_filepath, skiprows=[1])
-    file_list = [
+    file_list = sorted(
         file
         for file in os.listdir(txt_filepath)
         if "_".join(file.split("_")) in db.pH_optN.values
-    ]
-    data_dict = {}
-    for file in file_list:
-        fname = "./data/underway/pH/{}/{}.txt".format(file, file)
+    )
+    fnames = [os.path.join(txt_filepath, file, file + ".txt") for file in file_list]
+    for fname in fnames:
         print(fname)
-        data_dict[file] = pd.read_table(fname, skiprows=22, encoding="unicode_escape")
-    rn = {
-        "Date [A Ch.1 Main]": "date",
-        "Time [A Ch.1 Main]": "time",
-        " dt (s) [A Ch.1 Main]": "sec",
-        "pH [A Ch.1 Main]": "pH_cell",
-        "Sample Temp. (°C) [A Ch.1 CompT]": "temp_cell",
-        "dphi (°) [A Ch.1 Main]": "dphi",
-        "Signal Intensity (mV) [A Ch.1 Main]": "signal_intensity",
-        "Ambient Light (mV) [A Ch.1 Main]": "ambient_light",
-        "ldev (nm) [A Ch.1 Main]": "ldev",
-        "Status [A Ch.1 Main]": "status_ph",
-        "Status [A Ch.1 CompT]": "status_temp",
-    }
+    if max_workers == 1 or len(file_list) <= 1:
+        dfs = [
+            _read_cached(fname, file, cache_dir)
+            for fname, file in zip(fnames, file_list)
+        ]
+    else:
+        max_workers = min(max_workers or os.cpu_count() or 1, len(file_list))
+        with ProcessPoolExecutor(max_workers) as executor:
+            dfs = list(
+                executor.map(
+                    _read_cached, fnames, file_list, [cache_dir] * len(file_list)
+                )
+            )
+    data_dict = dict(zip(file_list, dfs))
     for file in file_list:
-        data_dict[file] = data_dict[file].rename(rn, axis=1)
-        data_dict[file]["filename"] = np.nan
-        data_dict[file].filename = file
-        data_dict[file]["date_time"] = np.nan
-        data_dict[file].date_time = data_dict[file].date + " " + data_dict[file].time
-        data_dict[file].date_time = pd.to_datetime(
-            data_dict[file].date_time, format="%d-%m-%Y %H:%M:%S.%f"
-        )
-
-        data_dict[file].dropna()
         print(file)
-        data_dict[file] = data_dict[file][
-            [
-                "filename",
-                "date_time",
-                "sec",
-                "pH_cell",
-                "temp_cell",
-                "dphi",
-                "signal_intensity",
-                "ambient_light",
-                "ldev",
-                "status_ph",
-                "status_temp",
-            ]
-        ]
     return data_dict, file_list
@@ -0,0 +1,210 @@
+import hashlib, io, os
+import pandas as pd, numpy as np
+
+# python friendly names of the SMB columns
+rn = {
+    "date time": "date_time",
+    "Weatherstation.PDWDC.Airtemperature": "WS_airtemp",
+    "Weatherstation.PDWDC.Barometric": "WS_baro",
+    "Weatherstation.PDWDC.Course": "WS_course",
+    "Weatherstation.PDWDC.Date": "WS_date",
+    "Weatherstation.PDWDC.Heading": "WS_heading",
+    "Weatherstation.PDWDC.Humidity": "WS_humidity",
+    "Weatherstation.PDWDC.Latitude": "WS_lat",
+    "Weatherstation.PDWDC.Longitude": "WS_lon",
+    "Weatherstation.PDWDC.Longwave": "WS_longwave",
+    "Weatherstation.PDWDC.NormalizedTo": "WS_normto",
+    "Weatherstation.PDWDC.Pyrogeometer": "WS_pyrogeometer",
+    "Weatherstation.PDWDC.SensorValue": "WS_sensorvalue",
+    "Weatherstation.PDWDC.Sentence": "WS_sentence",
+    "Weatherstation.PDWDC.Shortwave": "WS_shortwave",
+    "Weatherstation.PDWDC.Speed": "WS_speed",
+    "Weatherstation.PDWDC.Timestamp": "WS_timestamp",
+    "Weatherstation.PDWDC.Watertemperature": "WS_watertemp",
+    "Weatherstation.PDWDC.Winddirection_rel": "WS_winddirection_rel",
+    "Weatherstation.PDWDC.Winddirection_true": "WS_winddirection_true",
+    "Weatherstation.PDWDC.Windspeed_rel": "WS_windspeed_rel",
+    "Weatherstation.PDWDC.Windspeed_true": "WS_windspeed_true",
+    "Weatherstation.PDWDC.Windspeed_true_Bft": "WS_windspeed_true_bft",
+    "SMB.RSSMB.Chl": "chl",
+    "SMB.RSSMB.C_SBE45": "SBE_45_C",
+    "SMB.RSSMB.Date": "date",
+    "SMB.RSSMB.Delay": "delay",
+    "SMB.RSSMB.Depth": "depth",
+    "SMB.RSSMB.EW": "ew",
+    "SMB.RSSMB.Flow": "flow",
+    "SMB.RSSMB.Latitude": "lat",
+    "SMB.RSSMB.Longitude": "lon",
+    "SMB.RSSMB.Name": "smb_name",
+    "SMB.RSSMB.NS": "ns",
+    "SMB.RSSMB.RVK": "system",
+    "SMB.RSSMB.Sal_SBE45": "SBE45_sal",
+    "SMB.RSSMB.Sentence": "sentence",
+    "SMB.RSSMB.SN": "sn",
+    "SMB.RSSMB.SV_SBE45": "SBE45_sv",
+    "SMB.RSSMB.SV_insito": "insitu_sv",
+    "SMB.RSSMB.Status": "smb_status",
+    "SMB.RSSMB.SV_AML": "smb_sv_aml",
+    "SMB.RSSMB.T_SBE38": "SBE38_water_temp",
+    "SMB.RSSMB.T_SBE45": "SBE45_water_temp",
+    "SMB.RSSMB.Time": "smb_time",
+    "SMB.RSSMB.Tur": "smb_tur",
+}
+
+# Types of the (renamed) SMB columns, the others are read as text
+dtypes = {
+    "SBE38_water_temp": "float64",
+    "SBE45_sal": "float64",
+    "SBE45_water_temp": "float64",
+    "SBE_45_C": "float64",
+    "chl": "float64",
+    "flow": "float64",
+    "smb_tur": "float64",
+    "smb_name": "category",
+}
+
+# Columns of the SMB file needed to match it with the PyroScience data
+SMB_COLUMNS = ["date_time", "SBE38_water_temp", "SBE45_sal", "lat", "lon", "smb_name"]
+
+
+# The time index of an SMB file gives the first and last date_time of each block
+# of BLOCK_ROWS rows and where the block starts in the file.  It is saved in
+# INDEX_DIR, keyed by the path, size and modification time of the file
+INDEX_DIR = "data/processing/.smb_index"
+BLOCK_ROWS = 10000
+
+
+def _read(source, columns, skiprows=None):
+    """Parse SMB rows from a file or buffer, keeping only the (renamed) `columns`."""
+    names = {name: raw for raw, name in rn.items() if name in columns}
+    smb = pd.read_csv(
+        source,
+        skiprows=skiprows,
+        usecols=list(names.values()),
+        dtype={names[name]: dtypes.get(name, str) for name in names},
+        na_values=[9999, 9],
+        encoding="unicode_escape",
+        engine="c",
+    )
+    smb.rename(rn, axis=1, inplace=True)
+
+    # convert SMB date to pandas datetime, with the same resolution as the
+    # PyroSci date_time (parsed by read_pyrosci)
+    if "date_time" in smb:
+        smb["date_time"] = pd.to_datetime(
+            smb["date_time"], format="%Y/%m/%d %H:%M:%S"
+        ).astype("datetime64[ns]")
+    return smb
+
+
+def _line_ends(smb_filepath):
+    """Return the position after the end of each line of a file."""
+    ends = []
+    with open(smb_filepath, "rb") as f:
+        position = 0
+        for block in iter(lambda: f.read(1 << 26), b""):
+            ends.append(np.flatnonzero(np.frombuffer(block, np.uint8) == 10) + 1)
+            ends[-1] += position
+            position += len(block)
+    ends = np.concatenate(ends)
+    if not len(ends) or ends[-1] != position:
+        # Last line without a newline
+        ends = np.append(ends, position)
+    return ends
+
+
+def smb_index(smb_filepath, index_dir=INDEX_DIR):
+    """Return the time index of an SMB file, built the first time it is needed.
+
+    Returns None if the rows could not be matched with the lines of the file.
+    """
+    stat = os.stat(smb_filepath)
+    key = [os.path.abspath(smb_filepath), stat.st_size, stat.st_mtime_ns, BLOCK_ROWS]
+    sha = hashlib.sha256(repr(key).encode()).hexdigest()[:16]
+    index_file = os.path.join(
+        index_dir, "{}_{}.npz".format(os.path.basename(smb_filepath), sha)
+    )
+    if os.path.isfile(index_file):
+        with np.load(index_file) as index:
+            return dict(index) if len(index["start"]) else None
+
+    times = _read(smb_filepath, ["date_time"], skiprows=[1, 2])["date_time"]
+    # Header and the two rows below it, then one line per row
+    ends = _line_ends(smb_filepath)
+    if len(ends) != len(times) + 3:
+        # e.g. blank lines in the file, the index would be wrong
+        index = {key: np.array([], np.int64) for key in ["start", "first", "last"]}
+    else:
+        blocks = np.arange(0, len(times), BLOCK_ROWS)
+        nat = np.iinfo(np.int64).min
+        ns = times.to_numpy().view(np.int64)
+        valid = ns != nat
+        index = {
+            "header": ends[:1],
+            "start": ends[2:][blocks],
+            "stop": ends[3:][np.minimum(blocks + BLOCK_ROWS, len(times)) - 1],
+            # Blocks without any date_time are never selected
+            "first": np.minimum.reduceat(
+                np.where(valid, ns, np.iinfo(np.int64).max), blocks
+            ),
+            "last": np.maximum.reduceat(np.where(valid, ns, nat), blocks),
+        }
+    os.makedirs(index_dir, exist_ok=True)
+    np.savez(index_file + ".tmp.npz", **index)
+    os.replace(index_file + ".tmp.npz", index_file)
+    return index if len(index["start"]) else None
+
+
+def _merge_windows(windows):
+    """Return the sorted starts and ends of the union of time windows, in ns."""
+    windows = np.asarray(
+        [
+            [pd.Timestamp(start).value, pd.Timestamp(end).value]
+            for start, end in windows
+        ],
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    windows = windows[np.argsort(windows[:, 0])]
+    # A window starts a new interval if it starts after all previous ones ended
+    ends = np.maximum.accumulate(windows[:, 1])
+    new = np.ones(len(windows), bool)
+    new[1:] = windows[1:, 0] > ends[:-1]
+    return windows[new, 0], np.maximum.reduceat(windows[:, 1], np.flatnonzero(new))
+
+
+def read_smb(smb_filepath, columns=SMB_COLUMNS, windows=None):
+    """Import the SMB file, keeping only the (renamed) `columns`.
+
+    If `windows` is a list of (start, end) times, only the rows within them are
+    returned, and only the blocks of the file that overlap them are parsed.
+    """
+    if windows is None:
+        # The two rows below the header (units and sensor names) are not data
+        return _read(smb_filepath, columns, skiprows=[1, 2])
+    starts, ends = _merge_windows(windows)
+    columns = list(columns) + ["date_time"] * ("date_time" not in columns)
+    index = smb_index(smb_filepath)
+    if index is None:
+        smb = _read(smb_filepath, columns, skiprows=[1, 2])
+    else:
+        # Parse the header and the blocks that overlap a window
+        selected = np.flatnonzero(
+            (
+                (index["first"][:, np.newaxis] <= ends)
+                & (index["last"][:, np.newaxis] >= starts)
+            ).any(axis=1)
+        )
+        with open(smb_filepath, "rb") as f:
+            parts = [f.read(index["header"][0])]
+            for block in selected:
+                f.seek(index["start"][block])
+                parts.append(f.read(index["stop"][block] - index["start"][block]))
+        if parts[-1] and not parts[-1].endswith(b"\n"):
+            parts[-1] += b"\n"
+        smb = _read(io.BytesIO(b"".join(parts)), columns)
+
+    # Only keep the rows within a window
+    ns = smb["date_time"].to_numpy().view(np.int64)
+    window = np.searchsorted(starts, ns, side="right") - 1
+    inside = (window >= 0) & (ns <= ends[np.maximum(window, 0)])
+    return smb[inside].reset_index(drop=True)
@@ -0,0 +1,109 @@
+import json, os
+import pandas as pd, numpy as np
+from .read_smb import read_smb
+from .dms_to_dd import dms_to_dd
+from ..timealign import to_ns, nearest_rows
+
+# The SMB file is converted once into one .npy file per column in STORE_DIR, so
+# that it can be memory-mapped instead of parsed again: date_time as int64 (ns
+# since 1970), sorted, and the measurements as float32 (lat and lon in decimal
+# degrees).  Change STORE_VERSION whenever the conversion changes.  Nothing in
+# the processing scripts uses it yet: A04 keeps the SMB positions unconverted
+# and A07 (smb) needs the pump names (smb_name), which are not stored
+STORE_DIR = "data/processing/.smb_store"
+STORE_VERSION = 1
+STORE_COLUMNS = ["SBE38_water_temp", "SBE45_sal", "lat", "lon", "flow"]
+
+
+def write_smb_store(smb_filepath, store_dir=STORE_DIR):
+    """Convert an SMB file into memory-mappable column arrays."""
+    smb = read_smb(smb_filepath, ["date_time"] + STORE_COLUMNS)
+    smb = smb.dropna(subset=["date_time"])
+    smb = smb.sort_values("date_time", kind="stable")
+    smb["lat"] = dms_to_dd(smb.lat)
+    smb["lon"] = dms_to_dd(smb.lon)
+
+    folder = os.path.join(store_dir, os.path.basename(smb_filepath))
+    os.makedirs(folder, exist_ok=True)
+    # The metadata are written last, so an interrupted conversion is redone
+    meta_file = os.path.join(folder, "meta.json")
+    if os.path.isfile(meta_file):
+        os.remove(meta_file)
+    np.save(
+        os.path.join(folder, "date_time.npy"),
+        smb["date_time"].to_numpy().view(np.int64),
+    )
+    for column in STORE_COLUMNS:
+        np.save(
+            os.path.join(folder, column + ".npy"),
+            smb[column].to_numpy(dtype=np.float32),
+        )
+    with open(meta_file, "w") as f:
+        json.dump({"key": _store_key(smb_filepath), "rows": len(smb)}, f)
+
+
+def _store_key(smb_filepath):
+    stat = os.stat(smb_filepath)
+    return [
+        STORE_VERSION,
+        os.path.abspath(smb_filepath),
+        stat.st_size,
+        stat.st_mtime_ns,
+    ]
+
+
+def smb_store(smb_filepath, store_dir=STORE_DIR):
+    """Return the SMB columns as read-only memory-mapped arrays, in a dict.
+
+    The SMB file is converted first if it changed since its last conversion.
+    """
+    folder = os.path.join(store_dir, os.path.basename(smb_filepath))
+    meta_file = os.path.join(folder, "meta.json")
+    meta = {}
+    if os.path.isfile(meta_file):
+        with open(meta_file) as f:
+            meta = json.load(f)
+    if meta.get("key") != _store_key(smb_filepath):
+        write_smb_store(smb_filepath, store_dir)
+    return {
+        column: np.load(os.path.join(folder, column + ".npy"), mmap_mode="r")
+        for column in ["date_time"] + STORE_COLUMNS
+    }
+
+
+def smb_lookup(
+    times,
+    smb_filepath,
+    tolerance=pd.Timedelta(minutes=5),
+    columns=STORE_COLUMNS,
+    store_dir=STORE_DIR,
+):
+    """Return the SMB data nearest in time to each of `times`, within `tolerance`.
+
+    Like pd.merge_asof(direction="nearest"), ties go to the earlier SMB record.
+    Returns a DataFrame with one row per time, the SMB date_time matched to it
+    (smb_date_time) and NaN where no SMB record is close enough.
+    """
+    store = smb_store(smb_filepath, store_dir)
+    smb_times = store["date_time"]
+    times = pd.Series(times)
+
+    df = pd.DataFrame(index=times.index)
+    if not len(smb_times):
+        df["smb_date_time"] = pd.NaT
+        for column in columns:
+            df[column] = np.float32(np.nan)
+        return df
+
+    # The store is sorted without NaT, so it is searched in place
+    rows, _ = nearest_rows(to_ns(times), smb_times, tolerance, assume_sorted=True)
+    found = rows >= 0
+    nearest = np.clip(rows, 0, None)
+
+    nat = np.iinfo(np.int64).min
+    df["smb_date_time"] = np.where(found, smb_times[nearest], nat).view(
+        "datetime64[ns]"
+    )
+    for column in columns:
+        df[column] = np.where(found, store[column][nearest], np.float32(np.nan))
+    return df
@@ -0,0 +1,231 @@
+import os
+import pandas as pd
+from . import profiling
+
+# Intermediate files under data/processing are handed over from one stage to the
+# next.  When the stages run in the same interpreter (see run_pipeline), they can
+# be kept in memory instead of being written to and re-read from disk.
+#
+# They can also be stored as typed Parquet or Feather files instead of .csv (set
+# the SO289_INTERMEDIATE_FORMAT environment variable or settings["format"]).
+# Whatever the format, the columns listed in SCHEMAS for an intermediate are
+# returned with these dtypes, so that stages do not have to parse them again.
+settings = {
+    "keep_in_memory": False,
+    "write_files": True,
+    "format": os.environ.get("SO289_INTERMEDIATE_FORMAT", "csv"),
+}
+_memory = {}
+
+FORMATS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+
+# Columns of the underway pH time series (A07 onwards)
+_underway = {
+    "filename": "category",
+    "date_time": "datetime64[ns]",
+    "sec": "float64",
+    "pH_cell": "float64",
+    "temp_cell": "float64",
+    "dphi": "float32",
+    "signal_intensity": "float32",
+    "ambient_light": "float32",
+    "ldev": "float32",
+    "status_ph": "category",
+    "status_temp": "category",
+    "smb_name": "category",
+    "SBE38_water_temp": "float64",
+    "SBE45_sal": "float64",
+    "temp_diff": "float64",
+    "pH": "float64",
+    "lat": "float64",
+    "lon": "float64",
+}
+_underway_alkalinity = {
+    **_underway,
+    "ta_est": "float64",
+    "pH_insitu_ta_est": "float64",
+}
+_underway_corrected = {
+    **_underway_alkalinity,
+    "pH_corrected": "float64",
+    "pH_uncertainty": "float64",
+}
+
+# Columns of the underway discrete samples (lat and lon are kept as text here)
+_subsamples = {
+    "date_time": "datetime64[ns]",
+    "SBE45_sal": "float64",
+    "SBE38_water_temp": "float64",
+    "alkalinity": "float64",
+    "DIC": "float64",
+    "pH_total_est_TA_DIC": "float64",
+}
+
+# Subsamples with their uncertainty and offset from the optode pH (A17_C/D)
+_subsamples_offset = {
+    **_subsamples,
+    "pH_RMSE": "float64",
+    "pH_optode": "float64",
+    "offset": "float64",
+}
+
+# Dtypes of the main columns of each intermediate, keyed by file name
+SCHEMAS = {
+    "A04_match_TA_only_samples_with_SMB_sal_temp": {
+        "date_time": "datetime64[ns]",
+        "SBE45_sal": "float64",
+        "SBE38_water_temp": "float64",
+    },
+    "SO289_underway_TA_DIC_only_results": _subsamples,
+    "SO289_underway_TA_DIC_only_results_with_uncertainty": {
+        **_subsamples,
+        "pH_RMSE": "float64",
+        "pH_RMSE_iterations": "float64",
+    },
+    "A07_uws_match_pyroscience_smb": _underway,
+    "A08_remove_bad_pH": _underway,
+    "A09_estimate_alkalinity": _underway_alkalinity,
+    "A10_uws_correct_pH": {
+        **_underway_alkalinity,
+        "pchip_pH_difference": "float64",
+        "pH_optode_corrected": "float64",
+        "SMA": "float64",
+    },
+    "A10_uws_correct_pH_subsamples": {
+        **_subsamples,
+        "pH_optode": "float64",
+        "offset": "float64",
+        "pH_corr": "float64",
+        "diff": "float64",
+    },
+    "A17_uws_correct_pH_bootstrapping": _underway_corrected,
+    "A17_uws_correct_pH_bootstrapping_subsaomples_uncertainty": _underway_corrected,
+    "A17_uws_correct_pH_bootstrapping_subsamples": _subsamples_offset,
+    "A17_uws_correct_pH_bootstrapping_subsaomples_uncertainty_subsamples": _subsamples_offset,
+    # Tiers of the downsampled underway time series (A21), all other columns are
+    # statistics
+    **{
+        "A21_uws_pyramid_{}".format(freq): {"date_time": "datetime64[ns]"}
+        for freq in ["1min", "10min", "1h"]
+    },
+    "A03_correct_VINDTA_DIC_drift": {
+        "analysis_datetime": "datetime64[ns]",
+        "dic": "float64",
+        "dic_corrected": "float64",
+    },
+}
+
+
+def _key(path):
+    return os.path.normpath(path)
+
+
+def _name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def stored_path(path, fmt):
+    """Return the file path of an intermediate stored in a given format."""
+    return os.path.splitext(path)[0] + FORMATS[fmt]
+
+
+def stored_files(path):
+    """Return the existing files of an intermediate, in any format."""
+    if not path.endswith(".csv"):
+        return [path] if os.path.exists(path) else []
+    return [
+        stored_path(path, fmt)
+        for fmt in FORMATS
+        if os.path.exists(stored_path(path, fmt))
+    ]
+
+
+def _in_memory(path):
+    # Intermediates kept by an earlier run are ignored unless stages currently
+    # hand them over in memory
+    return settings["keep_in_memory"] and _key(path) in _memory
+
+
+def intermediate_exists(path):
+    """Return whether an intermediate is kept in memory or stored on disk."""
+    return _in_memory(path) or bool(stored_files(path))
+
+
+def apply_schema(df, path):
+    """Convert the columns of an intermediate to the dtypes in SCHEMAS."""
+    schema = SCHEMAS.get(_name(path), {})
+    for column, dtype in schema.items():
+        if column not in df or df[column].dtype == dtype:
+            continue
+        if dtype.startswith("datetime64"):
+            if not pd.api.types.is_datetime64_any_dtype(df[column]):
+                df[column] = pd.to_datetime(df[column], format="ISO8601")
+        else:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def read_intermediate(path, **kwargs):
+    """Read an intermediate file, from memory if a previous stage kept it there.
+
+    If the intermediate exists in several formats, the most recent file is read.
+    """
+    if _in_memory(path):
+        df = _memory[_key(path)].copy()
+        profiling.add_rows("in", df)
+        return df
+    files = stored_files(path)
+    if not files:
+        # Let pandas raise its usual error
+        return pd.read_csv(path, **kwargs)
+    latest = max(files, key=os.path.getmtime)
+    if latest.endswith(".parquet"):
+        df = pd.read_parquet(latest)
+    elif latest.endswith(".feather"):
+        df = pd.read_feather(latest)
+    else:
+        df = pd.read_csv(latest, **kwargs)
+    profiling.add_rows("in", df)
+    return apply_schema(df, path)
+
+
+def write_intermediate(df, path, index=True, **kwargs):
+    """Save an intermediate file to disk and/or keep it in memory."""
+    profiling.add_rows("out", df)
+    fmt = settings["format"]
+    # Mimic what reading back the file would give: the index is a column with
+    # its name, or "Unnamed: 0" in a .csv file if it has none (an unnamed index
+    # is left out of Parquet and Feather files)
+    named = any(name is not None for name in df.index.names)
+    if index and named:
+        stored = df.reset_index()
+    elif index and fmt == "csv":
+        stored = df.reset_index(names="Unnamed: 0")
+    else:
+        stored = df.reset_index(drop=True)
+    if settings["keep_in_memory"]:
+        keep_intermediate(apply_schema(stored, path), path)
+    if settings["write_files"]:
+        if fmt == "csv":
+            df.to_csv(path, index=index, **kwargs)
+        elif fmt == "parquet":
+            apply_schema(stored, path).to_parquet(stored_path(path, fmt), index=False)
+        elif fmt == "feather":
+            apply_schema(stored, path).to_feather(stored_path(path, fmt))
+        else:
+            raise ValueError("Unknown intermediate format: {}".format(fmt))
+
+
+def keep_intermediate(df, path):
+    """Keep a DataFrame in memory to be read as the intermediate file `path`."""
+    _memory[_key(path)] = df
+
+
+def kept_intermediates():
+    """Return a dict of the intermediates kept in memory, keyed by file path."""
+    return dict(_memory)
+
+
+def clear_intermediates():
+    """Forget all intermediates kept in memory."""
+    _memory.clear()
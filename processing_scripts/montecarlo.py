@@ -0,0 +1,206 @@
+import pandas as pd, numpy as np
+import PyCO2SYS as pyco2
+
+# Largest number of (iteration, sample) pairs solved in one pyco2.sys call, to
+# bound the memory taken by its hundreds of output arrays
+CHUNK_SIZE = 1000000
+
+
+def _sys_ta_dic(alkalinity, dic, salinity, temperature, **kwargs):
+    return pyco2.sys(
+        par1=alkalinity,
+        par2=dic,
+        par1_type=1,
+        par2_type=2,
+        opt_pH_scale=1,
+        salinity=salinity,
+        temperature=temperature,
+        **kwargs,
+    )
+
+
+def ph_from_ta_dic(alkalinity, dic, salinity, temperature, **kwargs):
+    """Calculate pH (total scale) from TA and DIC, broadcast over any shape."""
+    return _sys_ta_dic(alkalinity, dic, salinity, temperature, **kwargs)["pH_total"]
+
+
+def monte_carlo_pH(
+    alkalinity,
+    dic,
+    alkalinity_rmse,
+    dic_rmse,
+    n_iterations,
+    salinity,
+    temperature,
+    chunk_size=CHUNK_SIZE,
+    seed=None,
+):
+    """Calculate pH from TA and DIC drawn from normal distributions.
+
+    Returns an (n_iterations, n_samples) array.  The draws of many iterations
+    are solved together, in as few pyco2.sys calls as `chunk_size` allows.
+    """
+    alkalinity, dic, salinity, temperature = (
+        np.asarray(values, dtype=float)
+        for values in (alkalinity, dic, salinity, temperature)
+    )
+    rng = np.random.default_rng(seed)
+    n_samples = len(alkalinity)
+    step = max(1, chunk_size // max(1, n_samples))
+    pH = np.empty((n_iterations, n_samples))
+    for start in range(0, n_iterations, step):
+        shape = (min(step, n_iterations - start), n_samples)
+        pH[start : start + shape[0]] = ph_from_ta_dic(
+            alkalinity + rng.normal(0, alkalinity_rmse, shape),
+            dic + rng.normal(0, dic_rmse, shape),
+            salinity,
+            temperature,
+        )
+    return pH
+
+
+def rmse(values):
+    """Root mean square difference from the mean of each column."""
+    return np.sqrt(np.mean((values - np.mean(values, axis=0)) ** 2, axis=0))
+
+
+def welford_update(count, mean, m2, batch):
+    """Add a batch of draws (rows) to running counts, means and sums of squared
+    differences from the mean of each column, in place (Welford's algorithm,
+    combined per batch).
+    """
+    n = len(batch)
+    batch_mean = np.mean(batch, axis=0)
+    delta = batch_mean - mean
+    total = count + n
+    mean += delta * n / total
+    m2 += np.sum((batch - batch_mean) ** 2, axis=0) + delta**2 * count * n / total
+    count += n
+
+
+def streaming_monte_carlo_pH(
+    alkalinity,
+    dic,
+    alkalinity_rmse,
+    dic_rmse,
+    salinity,
+    temperature,
+    tolerance=1e-4,
+    batch_iterations=100,
+    max_iterations=100000,
+    seed=None,
+):
+    """Calculate the mean and RMSE of pH from TA and DIC drawn from normal
+    distributions, without keeping the draws.
+
+    Iterations are run in batches, only for the samples whose RMSE is not yet
+    known within `tolerance` (its standard error, RMSE / sqrt(2 n)), until
+    all of them are or `max_iterations` is reached.  Returns the mean, RMSE
+    and number of iterations of each sample.
+    """
+    alkalinity, dic, salinity, temperature = (
+        np.asarray(values, dtype=float)
+        for values in (alkalinity, dic, salinity, temperature)
+    )
+    rng = np.random.default_rng(seed)
+    count = np.zeros(len(alkalinity))
+    mean = np.zeros(len(alkalinity))
+    m2 = np.zeros(len(alkalinity))
+    # Samples with missing values never converge
+    active = np.isfinite(alkalinity + dic + salinity + temperature)
+    iterations = 0
+    while active.any() and iterations < max_iterations:
+        rows = np.flatnonzero(active)
+        shape = (min(batch_iterations, max_iterations - iterations), len(rows))
+        batch = ph_from_ta_dic(
+            alkalinity[rows] + rng.normal(0, alkalinity_rmse, shape),
+            dic[rows] + rng.normal(0, dic_rmse, shape),
+            salinity[rows],
+            temperature[rows],
+        )
+        sub_count, sub_mean, sub_m2 = count[rows], mean[rows], m2[rows]
+        welford_update(sub_count, sub_mean, sub_m2, batch)
+        count[rows], mean[rows], m2[rows] = sub_count, sub_mean, sub_m2
+        iterations += shape[0]
+        standard_error = np.sqrt(m2[rows] / count[rows]) / np.sqrt(2 * count[rows])
+        # Samples whose pH cannot be calculated (NaN) are dropped too
+        active[rows[~(standard_error > tolerance)]] = False
+
+    with np.errstate(invalid="ignore"):
+        pH_rmse = np.sqrt(m2 / count)
+    pH_mean = np.where(count > 0, mean, np.nan)
+    converged = (count > 0) & ~active
+    print(
+        "Monte Carlo: {} iterations, {} of {} samples converged".format(
+            iterations, converged.sum(), len(count)
+        )
+    )
+    return pH_mean, pH_rmse, count
+
+
+def linear_uncertainty_pH(
+    alkalinity, dic, alkalinity_rmse, dic_rmse, salinity, temperature
+):
+    """Propagate the TA and DIC uncertainties to pH to first order.
+
+    The derivatives of pH with respect to TA and DIC are computed by
+    PyCO2SYS, all samples at once.  Returns the pH and its uncertainty.
+    """
+    results = _sys_ta_dic(
+        alkalinity,
+        dic,
+        salinity,
+        temperature,
+        uncertainty_into=["pH_total"],
+        uncertainty_from={"par1": alkalinity_rmse, "par2": dic_rmse},
+    )
+    return results["pH_total"], results["u_pH_total"]
+
+
+def compare_uncertainty(
+    alkalinity,
+    dic,
+    alkalinity_rmse,
+    dic_rmse,
+    salinity,
+    temperature,
+    n_samples=20,
+    n_iterations=10000,
+    seed=None,
+):
+    """Compare the linear and Monte Carlo pH uncertainties of up to `n_samples`
+    samples, spread evenly through the data.
+
+    Returns a DataFrame of both uncertainties and their relative difference
+    for each of them, and prints the largest one.
+    """
+    alkalinity, dic, salinity, temperature = (
+        np.asarray(values, dtype=float)
+        for values in (alkalinity, dic, salinity, temperature)
+    )
+    valid = np.flatnonzero(np.isfinite(alkalinity + dic + salinity + temperature))
+    rows = valid[np.linspace(0, len(valid) - 1, min(n_samples, len(valid))).astype(int)]
+    subset = [values[rows] for values in (alkalinity, dic)]
+    conditions = [values[rows] for values in (salinity, temperature)]
+    check = pd.DataFrame(index=pd.Index(rows, name="sample"))
+    check["linear"] = linear_uncertainty_pH(
+        *subset, alkalinity_rmse, dic_rmse, *conditions
+    )[1]
+    check["monte_carlo"] = rmse(
+        monte_carlo_pH(
+            *subset,
+            alkalinity_rmse,
+            dic_rmse,
+            n_iterations,
+            *conditions,
+            seed=seed,
+        )
+    )
+    check["difference"] = check["monte_carlo"] / check["linear"] - 1
+    print(
+        "Linear vs Monte Carlo ({} iterations) pH uncertainty of {} samples: "
+        "up to {:.2%} apart".format(
+            n_iterations, len(check), check["difference"].abs().max()
+        )
+    )
+    return check
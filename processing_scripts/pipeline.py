@@ -0,0 +1,664 @@
+import datetime, hashlib, json, os, runpy, shutil, subprocess, sys, tempfile, time
+from collections import namedtuple
+from . import intermediates, profiling
+
+# Each stage is one of the AXX scripts at the root of the repo, with the files it
+# reads and the files it writes (figures are not tracked)
+Stage = namedtuple("Stage", ["name", "script", "inputs", "outputs"])
+
+STAGES = [
+    Stage(
+        "A01",
+        "A01_combine_GEOMAR_CTD_data_and_nuts.py",
+        [
+            "data/ctd/son_289_ssCTD_btl.xlsx",
+            "data/ctd/SO289_nutrient results_format_friendly_LD.xlsx",
+        ],
+        ["data/processing/A01_combine_GEOMAR_CTD_data_and_nuts.csv"],
+    ),
+    Stage(
+        "A02",
+        "A02_process_VINDTA_TA_DIC.py",
+        [
+            "data/vindta/TA_DIC/logfile.bak",
+            "data/vindta/TA_DIC/64PE503_SO289_2022.dbs",
+            "data/vindta/TA_DIC/64PE503_SO289_2022/",
+            "data/processing/A01_combine_GEOMAR_CTD_data_and_nuts.csv",
+        ],
+        ["data/processing/vindta/A02_process_SO289.csv"],
+    ),
+    Stage(
+        "A03",
+        "A03_correct_VINDTA_DIC_drift.py",
+        ["data/processing/vindta/A02_process_SO289.csv"],
+        [
+            "data/processing/vindta/SO289_CTD_TA_DIC_results.csv",
+            "data/processing/vindta/A03_correct_VINDTA_DIC_drift.csv",
+        ],
+    ),
+    Stage(
+        "A04",
+        "A04_match_TA_only_samples_with_SMB_sal_temp.py",
+        [
+            "data/processing/list_uws_samples.csv",
+            "data/underway/SMB/SMB_data_galley.dat",
+        ],
+        ["data/processing/vindta/A04_match_TA_only_samples_with_SMB_sal_temp.csv"],
+    ),
+    Stage(
+        "A05",
+        "A05_process_VINDTA_TA_only.py",
+        [
+            "data/vindta/TA_ONLY/logfile.bak",
+            "data/vindta/TA_ONLY/SO289_TA_only.dbs",
+            "data/vindta/TA_ONLY/SO289_TA_only/",
+            "data/vindta/TA_ONLY/SO289_NaOH.xlsx",
+            "data/processing/A01_combine_GEOMAR_CTD_data_and_nuts.csv",
+            "data/processing/vindta/A04_match_TA_only_samples_with_SMB_sal_temp.csv",
+        ],
+        [
+            "data/processing/vindta/SO289_CTD_TA_only_results.csv",
+            "data/processing/vindta/A05_SO289_UWS_TA_only_results.csv",
+            "data/processing/vindta/SO289_TA_exp_TA_only_results.csv",
+        ],
+    ),
+    Stage(
+        "A06",
+        "A06_combine_TA_DIC_only_subsamples.py",
+        [
+            "data/processing/vindta/A05_SO289_UWS_TA_only_results.csv",
+            "data/processing/vindta/A04_match_TA_only_samples_with_SMB_sal_temp.csv",
+            "data/quaatro/DIC_vials/230112 DIC LOUISE DR1R1_format_friendly.xlsx",
+        ],
+        ["data/processing/vindta/SO289_underway_TA_DIC_only_results.csv"],
+    ),
+    Stage(
+        "A07",
+        "A07_uws_match_pyroscience_smb.py",
+        [
+            "data/underway/SO289_UWS_continuous_file_list.xlsx",
+            "data/underway/pH/",
+            "data/underway/SMB/SMB_data_galley.dat",
+        ],
+        ["data/processing/optode/A07_uws_match_pyroscience_smb.csv"],
+    ),
+    Stage(
+        "A08",
+        "A08_uws_remove_bad_pH.py",
+        ["data/processing/optode/A07_uws_match_pyroscience_smb.csv"],
+        ["data/processing/optode/A08_remove_bad_pH.csv"],
+    ),
+    Stage(
+        "A09",
+        "A09_uws_estimate_alkalinity.py",
+        ["data/processing/optode/A08_remove_bad_pH.csv"],
+        ["data/processing/optode/A09_estimate_alkalinity.csv"],
+    ),
+    Stage(
+        "A10",
+        "A10_uws_correct_pH.py",
+        [
+            "data/processing/optode/A09_estimate_alkalinity.csv",
+            "data/processing/vindta/SO289_underway_TA_DIC_only_results.csv",
+        ],
+        [
+            "data/processing/optode/A10_uws_correct_pH.csv",
+            "data/processing/optode/A10_uws_correct_pH_subsamples.csv",
+        ],
+    ),
+    Stage(
+        "A11",
+        "A11_combine_all_CTD_TA_DIC_discrete_samples.py",
+        [
+            "data/processing/vindta/SO289_CTD_TA_DIC_results.csv",
+            "data/processing/A01_combine_GEOMAR_CTD_data_and_nuts.csv",
+            "data/processing/vindta/SO289_CTD_TA_only_results.csv",
+            "data/quaatro/DIC_vials/230112 DIC LOUISE ER1R1_format_friendly.xlsx",
+        ],
+        ["data/processing/vindta/SO289_CTD_data_TA_DIC_combined.csv"],
+    ),
+    Stage(
+        "A12",
+        "A12_format_CTD_discrete_samples.py",
+        ["data/processing/vindta/SO289_CTD_data_TA_DIC_combined.csv"],
+        ["data/_results/SO289_CTD_discrete_samples_V6_with_oxy.csv"],
+    ),
+    Stage(
+        "A13",
+        "A13_format_underway_discrete_samples.py",
+        [
+            "data/processing/vindta/SO289_underway_TA_DIC_only_results_with_uncertainty.csv"
+        ],
+        ["data/_results/SO289_UWS_discrete_samples_V2_uncertainty.csv"],
+    ),
+    Stage(
+        "A14",
+        "A14_format_underway_pH.py",
+        [
+            "data/processing/optode/A17_uws_correct_pH_bootstrapping_subsaomples_uncertainty.csv"
+        ],
+        ["data/_results/SO289_UWS_time_series_V2_uncertainty.csv"],
+    ),
+    Stage(
+        "A15",
+        "A15_format_TA_experiment.py",
+        [
+            "data/processing/vindta/SO289_TA_exp_TA_only_results.csv",
+            "data/vindta/TA_ONLY/SO289_NaOH.xlsx",
+            "data/quaatro/DIC_vials/TA_experiment_DIC_friendly.xlsx",
+        ],
+        ["data/_results/SO289_TA_enhancement_experiment_V4.csv"],
+    ),
+    Stage(
+        "A16",
+        "A16_check_temperature_sources.py",
+        ["data/processing/optode/A10_uws_correct_pH.csv"],
+        [],
+    ),
+    Stage(
+        "A17_A",
+        "A17_A_NUTS_RMSE.py",
+        ["data/processing/vindta/A02_process_SO289.csv"],
+        [],
+    ),
+    Stage(
+        "A17_B",
+        "A17_B_uws_correct_pH_TA_DIC_montecarlo.py",
+        ["data/processing/vindta/SO289_underway_TA_DIC_only_results.csv"],
+        [
+            "data/processing/vindta/SO289_underway_TA_DIC_only_results_with_uncertainty.csv"
+        ],
+    ),
+    Stage(
+        "A17_C",
+        "A17_C_uws_correct_pH_bootstrapping_subsamples_uncertainty.py",
+        [
+            "data/processing/optode/A09_estimate_alkalinity.csv",
+            "data/processing/vindta/SO289_underway_TA_DIC_only_results_with_uncertainty.csv",
+        ],
+        [
+            "data/processing/optode/A17_uws_correct_pH_bootstrapping_subsaomples_uncertainty.csv",
+            "data/processing/optode/A17_uws_correct_pH_bootstrapping_subsaomples_uncertainty_subsamples.csv",
+        ],
+    ),
+    Stage(
+        "A17_D",
+        "A17_D_uws_correct_pH_bootstrapping.py",
+        [
+            "data/processing/optode/A09_estimate_alkalinity.csv",
+            "data/processing/vindta/SO289_underway_TA_DIC_only_results_with_uncertainty.csv",
+        ],
+        [
+            "data/processing/optode/A17_uws_correct_pH_bootstrapping.csv",
+            "data/processing/optode/A17_uws_correct_pH_bootstrapping_subsamples.csv",
+        ],
+    ),
+    Stage(
+        "A18",
+        "A18_compare_alkalinity.py",
+        [
+            "data/processing/vindta/SO289_underway_TA_DIC_only_results_with_uncertainty.csv"
+        ],
+        [],
+    ),
+    Stage(
+        "A19",
+        "A19_fit_alkalinity.py",
+        [
+            "data/processing/vindta/SO289_underway_TA_DIC_only_results_with_uncertainty.csv"
+        ],
+        [],
+    ),
+    Stage(
+        "A21",
+        "A21_uws_downsample_pyramid.py",
+        ["data/processing/optode/A10_uws_correct_pH.csv"],
+        [
+            "data/processing/optode/A21_uws_pyramid_1min.csv",
+            "data/processing/optode/A21_uws_pyramid_10min.csv",
+            "data/processing/optode/A21_uws_pyramid_1h.csv",
+        ],
+    ),
+    Stage(
+        "A20",
+        "A20_plot_figures.py",
+        [
+            "data/processing/vindta/A03_correct_VINDTA_DIC_drift.csv",
+            "data/processing/optode/A07_uws_match_pyroscience_smb.csv",
+            "data/processing/optode/A08_remove_bad_pH.csv",
+            "data/processing/optode/A10_uws_correct_pH.csv",
+            "data/processing/optode/A10_uws_correct_pH_subsamples.csv",
+            "data/processing/optode/A17_uws_correct_pH_bootstrapping_subsaomples_uncertainty.csv",
+            "data/processing/optode/A17_uws_correct_pH_bootstrapping_subsaomples_uncertainty_subsamples.csv",
+            "data/processing/optode/A17_uws_correct_pH_bootstrapping.csv",
+            "data/processing/optode/A17_uws_correct_pH_bootstrapping_subsamples.csv",
+            "data/PLOTTING_processed_uws_data_with_uncertainty_bootstrapping.csv",
+            "data/PLOTTING_subsamples_with_corrections.csv",
+            "data/SO289 carbonate data-Li Qiu-update_LD.xlsx",
+        ],
+        [],
+    ),
+]
+
+# Stages run by default (same selection as the original A00 script, with its
+# figures rendered by A20)
+DEFAULT_STAGES = [
+    "A01",
+    "A02",
+    "A03",
+    "A04",
+    "A05",
+    "A06",
+    "A07",
+    "A08",
+    "A09",
+    "A10",
+    "A11",
+    "A12",
+    "A13",
+    "A14",
+    "A20",
+]
+
+# Stages that only render figures, left out with --no-plots
+PLOT_STAGES = ["A16", "A20"]
+
+
+# Hashes of the inputs of each stage at its last successful run
+CACHE_FILE = "data/processing/.pipeline_cache.json"
+
+# Timings, peak memory and row counts of the last run (see profiling.py)
+REPORT_FILE = "data/processing/.pipeline_report.json"
+
+# Runs a stage script in its own process and records its performance
+RUNNER = (
+    "import sys; from processing_scripts.profiling import run_script; "
+    "run_script(sys.argv[1])"
+)
+
+# Library code used by the stages, hashed together with each stage script
+LIBRARY = "processing_scripts/"
+
+# Maximum number of processes in the pools started by the stages themselves
+# (e.g. to read the PyroScience files), passed on by run_pipeline
+POOL_WORKERS_ENV = "SO289_POOL_WORKERS"
+
+
+class StageError(RuntimeError):
+    """Raised when a pipeline stage exits with an error."""
+
+
+def _normpath(path):
+    return os.path.normpath(path)
+
+
+def get_pool_workers():
+    """Return the number of processes a stage may pool (1 unless set by run_pipeline).
+
+    Scripts that start a pool must keep their code under
+    if __name__ == "__main__": so that the processes of the pool do not run it
+    again on platforms where they are spawned (Windows, macOS).
+    """
+    return int(os.environ.get(POOL_WORKERS_ENV) or 1)
+
+
+def get_stages(names=None):
+    """Return the Stage objects for a list of stage names (default: all)."""
+    if names is None:
+        return list(STAGES)
+    lookup = {stage.name: stage for stage in STAGES}
+    unknown = [name for name in names if name not in lookup]
+    if unknown:
+        raise ValueError("Unknown pipeline stage(s): {}".format(", ".join(unknown)))
+    # Keep the order of STAGES whatever the order of names
+    return [stage for stage in STAGES if stage.name in names]
+
+
+def build_graph(stages):
+    """Map each stage name to the names of the stages it depends on.
+
+    A stage depends on another one if it reads a file that the other one writes.
+    Files written by stages that are not selected are treated as raw inputs.
+    """
+    producers = {}
+    for stage in stages:
+        for output in stage.outputs:
+            producers[_normpath(output)] = stage.name
+    graph = {}
+    for stage in stages:
+        graph[stage.name] = sorted(
+            set(
+                producers[_normpath(i)]
+                for i in stage.inputs
+                if _normpath(i) in producers and producers[_normpath(i)] != stage.name
+            )
+        )
+    # Check for cycles so that the runner cannot hang
+    done, visiting = set(), set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError("Dependency cycle in pipeline at stage {}".format(name))
+        visiting.add(name)
+        for dep in graph[name]:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in graph:
+        visit(name)
+    return graph
+
+
+def _file_hash(path, known):
+    """Return the SHA-256 of a file, reusing `known` if size and mtime match."""
+    stat = os.stat(path)
+    key = [stat.st_size, stat.st_mtime_ns]
+    entry = known.get(path)
+    if entry is not None and entry["stat"] == key:
+        return entry["sha256"]
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    known[path] = {"stat": key, "sha256": sha.hexdigest()}
+    return known[path]["sha256"]
+
+
+def hash_path(path, known):
+    """Return a content hash for a file, or for all files in a directory."""
+    if os.path.isfile(path):
+        return _file_hash(path, known)
+    if not os.path.isdir(path):
+        return None
+    sha = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        for file in sorted(files):
+            fpath = os.path.join(root, file)
+            sha.update(os.path.relpath(fpath, path).encode())
+            sha.update(_file_hash(fpath, known).encode())
+    return sha.hexdigest()
+
+
+def stage_signature(stage, known, cwd="."):
+    """Hash the script, library code and input files of a stage together."""
+    sha = hashlib.sha256()
+    for path in [stage.script, LIBRARY] + list(stage.inputs):
+        sha.update(path.encode())
+        # Intermediates may be stored as .csv, .parquet and/or .feather files
+        for fpath in intermediates.stored_files(os.path.join(cwd, path)):
+            sha.update(os.path.basename(fpath).encode())
+            sha.update(hash_path(fpath, known).encode())
+    return sha.hexdigest()
+
+
+def load_cache(cache_file):
+    if os.path.isfile(cache_file):
+        with open(cache_file) as f:
+            return json.load(f)
+    return {"files": {}, "stages": {}}
+
+
+def save_cache(cache, cache_file):
+    os.makedirs(os.path.dirname(cache_file) or ".", exist_ok=True)
+    with open(cache_file, "w") as f:
+        json.dump(cache, f, indent=1)
+
+
+def is_up_to_date(stage, signature, cache, cwd="."):
+    """Check if a stage already ran with the same inputs and its outputs exist."""
+    return cache["stages"].get(stage.name) == signature and all(
+        intermediates.stored_files(os.path.join(cwd, output))
+        for output in stage.outputs
+    )
+
+
+def _run_in_process(script, cwd="."):
+    """Run a stage script in the current interpreter."""
+    previous = os.getcwd()
+    os.chdir(cwd)
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as error:
+        if error.code not in (None, 0):
+            raise StageError(
+                "{} failed with exit code {}".format(script, error.code)
+            ) from error
+    except Exception as error:
+        raise StageError("{} failed: {!r}".format(script, error)) from error
+    finally:
+        os.chdir(previous)
+        # Do not let figures pile up from one stage to the next
+        pyplot = sys.modules.get("matplotlib.pyplot")
+        if pyplot is not None:
+            pyplot.close("all")
+
+
+def run_stage(name, inputs=None, write=False, cwd="."):
+    """Run a single stage in the current interpreter, as a function of DataFrames.
+
+    `inputs` maps input file paths to DataFrames that are used instead of reading
+    these files.  Returns a dict mapping the stage's output file paths to their
+    DataFrames.  Output files are only written if `write` is True.  The inputs
+    and outputs are not kept in memory afterwards.
+    """
+    stage = get_stages([name])[0]
+    settings = dict(intermediates.settings)
+    kept_before = intermediates.kept_intermediates()
+    intermediates.settings.update(keep_in_memory=True, write_files=write)
+    try:
+        for path, df in (inputs or {}).items():
+            intermediates.keep_intermediate(df, path)
+        _run_in_process(stage.script, cwd)
+        kept = intermediates.kept_intermediates()
+        return {
+            path: kept[_normpath(path)]
+            for path in stage.outputs
+            if _normpath(path) in kept
+        }
+    finally:
+        intermediates.settings.update(settings)
+        # Only leave the intermediates that were kept before the stage
+        intermediates.clear_intermediates()
+        for path, df in kept_before.items():
+            intermediates.keep_intermediate(df, path)
+
+
+def run_pipeline(
+    names=None,
+    max_workers=None,
+    cwd=".",
+    force=False,
+    in_process=False,
+    write_intermediates=False,
+    intermediate_format=None,
+    report_file=REPORT_FILE,
+    pool_workers=None,
+):
+    """Run pipeline stages in parallel, following their file dependencies.
+
+    Each stage runs in its own Python process, with at most `max_workers`
+    processes at the same time.  As soon as one stage fails, no new stage is
+    started, the running ones are stopped and a StageError is raised.
+
+    A stage is skipped if its script, the processing_scripts code and its input
+    files have the same content hashes as at its last successful run, unless
+    `force` is True.
+
+    With `in_process`, the stages instead run one after the other in the current
+    interpreter, so that imports are only paid once, and intermediate files are
+    handed over in memory.  They are only written to disk if `write_intermediates`
+    is True (otherwise all stages are rerun, as their outputs on disk are stale).
+
+    `intermediate_format` ("csv", "parquet" or "feather") sets the format in
+    which the stages save their intermediate files.
+
+    Stages that can use a pool of processes of their own (see get_pool_workers)
+    are allowed `pool_workers` processes (default: one per CPU).
+
+    The wall time, CPU time, peak RSS and rows in and out of each stage, and of
+    the processing functions it called, are saved to `report_file` (relative to
+    `cwd`) together with their changes since the previous run, and printed as a
+    table.  Rows in and out of a stage count the intermediate files it read and
+    wrote.  The CPU time includes the process pools of the stages.  With
+    `in_process`, the peak RSS is that of the whole run so far.
+    """
+    stages = get_stages(DEFAULT_STAGES if names is None else names)
+    graph = build_graph(stages)
+    scripts = {stage.name: stage.script for stage in stages}
+    by_name = {stage.name: stage for stage in stages}
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    cache_file = os.path.join(cwd, CACHE_FILE)
+    cache = load_cache(cache_file)
+    signatures = {}
+    settings = dict(intermediates.settings)
+    profile_settings = dict(profiling.settings)
+    profile_dir = tempfile.mkdtemp(prefix="so289_profile_")
+    report = {
+        "started": datetime.datetime.now().isoformat(timespec="seconds"),
+        "in_process": in_process,
+        "format": intermediate_format or intermediates.settings["format"],
+        "stages": [],
+    }
+    if pool_workers is None:
+        pool_workers = os.cpu_count() or 1
+    env = dict(os.environ)
+    env[POOL_WORKERS_ENV] = str(pool_workers)
+    previous_pool_workers = os.environ.get(POOL_WORKERS_ENV)
+    if intermediate_format is not None:
+        if intermediate_format not in intermediates.FORMATS:
+            raise ValueError(
+                "Unknown intermediate format: {}".format(intermediate_format)
+            )
+        intermediates.settings["format"] = intermediate_format
+        env["SO289_INTERMEDIATE_FORMAT"] = intermediate_format
+    if in_process:
+        intermediates.settings.update(
+            keep_in_memory=True, write_files=write_intermediates
+        )
+    use_cache = not in_process or write_intermediates
+    if in_process:
+        profiling.settings.update(enabled=True, file=None)
+        os.environ[POOL_WORKERS_ENV] = str(pool_workers)
+
+    def report_stage(name, status, wall=None, records=()):
+        stage = {"name": name, "script": scripts[name], "status": status}
+        if wall is not None:
+            stage["wall_s"] = wall
+        for rec in records:
+            if rec["type"] == "stage":
+                stage.update({k: v for k, v in rec.items() if k != "type"})
+        stage["functions"] = [rec for rec in records if rec["type"] == "function"]
+        report["stages"].append(stage)
+
+    def stage_records(name):
+        return profiling.read_records(os.path.join(profile_dir, name + ".jsonl"))
+
+    def record(name, start, records):
+        wall = time.perf_counter() - start
+        print("Finished {} in {:.1f} s".format(scripts[name], wall))
+        report_stage(name, "ran", wall, records)
+        if use_cache:
+            cache["stages"][name] = signatures[name]
+            save_cache(cache, cache_file)
+        finished.append(name)
+
+    pending = [stage.name for stage in stages]
+    running = {}
+    finished = []
+    try:
+        while pending or running:
+            # Start every stage whose dependencies have all finished
+            for name in list(pending):
+                if len(running) >= max_workers:
+                    break
+                if not all(dep in finished for dep in graph[name]):
+                    continue
+                pending.remove(name)
+                signatures[name] = stage_signature(by_name[name], cache["files"], cwd)
+                if (
+                    use_cache
+                    and not force
+                    and is_up_to_date(by_name[name], signatures[name], cache, cwd)
+                ):
+                    print("Skipping {} (up to date)".format(scripts[name]))
+                    report_stage(name, "skipped")
+                    finished.append(name)
+                    continue
+                print("Running {}".format(scripts[name]))
+                start = time.perf_counter()
+                if in_process:
+                    start_cpu = profiling.start_stage()
+                    try:
+                        _run_in_process(scripts[name], cwd)
+                    finally:
+                        records = list(profiling.records)
+                        records.append(profiling.stage_record(start_cpu))
+                    record(name, start, records)
+                    # Restart from the first pending stage, in order
+                    break
+                stage_env = dict(
+                    env,
+                    SO289_PROFILE_FILE=os.path.join(profile_dir, name + ".jsonl"),
+                )
+                running[name] = (
+                    subprocess.Popen(
+                        [sys.executable, "-c", RUNNER, scripts[name]],
+                        cwd=cwd,
+                        env=stage_env,
+                    ),
+                    start,
+                )
+            if not running:
+                continue
+
+            # Wait for at least one stage to finish
+            time.sleep(0.1)
+            for name, (process, start) in list(running.items()):
+                returncode = process.poll()
+                if returncode is None:
+                    continue
+                del running[name]
+                if returncode != 0:
+                    report_stage(
+                        name,
+                        "failed",
+                        time.perf_counter() - start,
+                        stage_records(name),
+                    )
+                    for other, _ in running.values():
+                        other.terminate()
+                    for other, _ in running.values():
+                        other.wait()
+                    raise StageError(
+                        "{} failed with exit code {}".format(scripts[name], returncode)
+                    )
+                record(name, start, stage_records(name))
+    except StageError:
+        if in_process:
+            report_stage(name, "failed", time.perf_counter() - start, records)
+        raise
+    finally:
+        # Stop the stages still running (e.g. after Ctrl+C) before removing the
+        # folder they write their profile records to
+        for process, _ in running.values():
+            process.terminate()
+        for process, _ in running.values():
+            process.wait()
+        if in_process:
+            intermediates.clear_intermediates()
+            if previous_pool_workers is None:
+                os.environ.pop(POOL_WORKERS_ENV, None)
+            else:
+                os.environ[POOL_WORKERS_ENV] = previous_pool_workers
+        intermediates.settings.update(settings)
+        profiling.settings.update(profile_settings)
+        shutil.rmtree(profile_dir, ignore_errors=True)
+        if report_file is not None and report["stages"]:
+            profiling.save_report(report, os.path.join(cwd, report_file))
+            profiling.print_report(report)
+    return finished
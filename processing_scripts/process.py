@@ -1,17 +1,19 @@
 from processing_scripts import read_pyrosci
 from processing_scripts import logbook
 from processing_scripts import smb
-from processing_scripts import alkalinity
 
 
-def raw_process(datasheet_filepath, txt_filepath, smb_filepath):
-    data_dict, file_list = read_pyrosci(datasheet_filepath, txt_filepath)
+def raw_process(datasheet_filepath, txt_filepath, smb_filepath, max_workers=1):
+    data_dict, file_list = read_pyrosci(datasheet_filepath, txt_filepath, max_workers)
     data = logbook(data_dict, file_list)
     df = smb(data, smb_filepath)
     return df
 
 
-def bgc_process(df):
+def bgc_process(df, max_workers=1):
+    # Imported here so that raw_process does not need PyCO2SYS
+    from processing_scripts import alkalinity
+
     # dat_sal = salinity(df)
-    dat_alk = alkalinity(df)
+    dat_alk = alkalinity(df, max_workers=max_workers)
     return dat_alk
@@ -0,0 +1,291 @@
+import functools, json, os, runpy, sys, time
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+# Performance records of a pipeline run (see run_pipeline): the processing
+# functions decorated with @profiled and the intermediates read and written by a
+# stage report their wall time, CPU time, peak memory and numbers of rows here.
+# Nothing is recorded unless settings["enabled"] is True, or the
+# SO289_PROFILE_FILE environment variable is set, in which case each record is
+# also appended to that file as a line of JSON (this is how the stages that run
+# in their own process hand their records over to run_pipeline).
+settings = {
+    "enabled": bool(os.environ.get("SO289_PROFILE_FILE")),
+    "file": os.environ.get("SO289_PROFILE_FILE"),
+}
+records = []
+_rows = {"in": 0, "out": 0}
+
+
+def _maxrss_mb(usage):
+    # In bytes on macOS, in kB elsewhere
+    return usage.ru_maxrss / (1024**2 if sys.platform == "darwin" else 1024)
+
+
+def peak_rss_mb():
+    """Return the peak resident memory of this process so far, in MB."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    return _maxrss_mb(resource.getrusage(resource.RUSAGE_SELF))
+
+
+def pool_rss_mb():
+    """Return the peak resident memory of the largest finished child process
+    (e.g. a worker of the pools of read_pyrosci, alkalinity or render_figures)
+    so far, in MB, or None if there was none.
+    """
+    if resource is None:
+        return None
+    return _maxrss_mb(resource.getrusage(resource.RUSAGE_CHILDREN)) or None
+
+
+def cpu_time():
+    """Return the CPU time of this process and of its finished child processes,
+    so that the work done in process pools is counted too.
+    """
+    total = time.process_time()
+    if resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+def count_rows(obj):
+    """Count the rows of DataFrames, also inside dicts, lists and tuples."""
+    if hasattr(obj, "shape") and hasattr(obj, "__len__"):
+        return len(obj)
+    if isinstance(obj, dict):
+        return sum(count_rows(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(count_rows(value) for value in obj)
+    return 0
+
+
+def save_record(record):
+    """Keep a performance record, and append it to the profile file if any."""
+    records.append(record)
+    if settings["file"]:
+        with open(settings["file"], "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+def add_rows(direction, df):
+    """Count the rows of an intermediate read ("in") or written ("out")."""
+    if settings["enabled"]:
+        _rows[direction] += count_rows(df)
+
+
+def profiled(function):
+    """Record the wall time, CPU time, peak RSS and rows in and out of a function."""
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not settings["enabled"]:
+            return function(*args, **kwargs)
+        # Counted first, as some functions modify their input dicts
+        rows_in = count_rows(args) + count_rows(kwargs)
+        start, start_cpu = time.perf_counter(), cpu_time()
+        result = function(*args, **kwargs)
+        save_record(
+            {
+                "type": "function",
+                "name": function.__name__,
+                "wall_s": time.perf_counter() - start,
+                "cpu_s": cpu_time() - start_cpu,
+                "peak_rss_mb": peak_rss_mb(),
+                "pool_rss_mb": pool_rss_mb(),
+                "rows_in": rows_in,
+                "rows_out": count_rows(result),
+            }
+        )
+        return result
+
+    return wrapper
+
+
+def start_stage():
+    """Forget the records of the previous stage."""
+    records.clear()
+    _rows.update({"in": 0, "out": 0})
+    return cpu_time()
+
+
+def stage_record(start_cpu):
+    """Return the CPU time, peak RSS and rows in and out of the current stage."""
+    return {
+        "type": "stage",
+        "cpu_s": cpu_time() - start_cpu,
+        "peak_rss_mb": peak_rss_mb(),
+        "pool_rss_mb": pool_rss_mb(),
+        "rows_in": _rows["in"],
+        "rows_out": _rows["out"],
+    }
+
+
+def run_script(script):
+    """Run a stage script as __main__ and append its stage record to the profile file.
+
+    Used by run_pipeline to start the stages that run in their own process.
+    """
+    start_cpu = start_stage()
+    sys.argv = [script]
+    try:
+        runpy.run_path(script, run_name="__main__")
+    finally:
+        save_record(stage_record(start_cpu))
+
+
+def read_records(path):
+    """Read the records appended to a profile file."""
+    if not os.path.isfile(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# Numbers compared between two runs in the report
+METRICS = ["wall_s", "cpu_s", "peak_rss_mb", "pool_rss_mb", "rows_in", "rows_out"]
+
+# Peak memory is the largest of the records, other metrics are summed
+PEAK_METRICS = ["peak_rss_mb", "pool_rss_mb"]
+
+
+def _compare(new, old):
+    """Return the previous value, new value and relative change of each metric."""
+    diff = {}
+    for metric in METRICS:
+        if new.get(metric) is None or old.get(metric) is None:
+            continue
+        change = None
+        if old[metric]:
+            change = (new[metric] - old[metric]) / old[metric]
+        diff[metric] = {
+            "previous": old[metric],
+            "current": new[metric],
+            "change": change,
+        }
+    return diff
+
+
+def _function_totals(stage):
+    """Sum the records of the functions of a stage, by function name."""
+    totals = {}
+    for record in stage.get("functions", []):
+        total = totals.setdefault(
+            record["name"], {"calls": 0, **{metric: 0 for metric in METRICS}}
+        )
+        total["calls"] += 1
+        for metric in METRICS:
+            if metric in PEAK_METRICS:
+                total[metric] = max(total[metric] or 0, record.get(metric) or 0) or None
+            else:
+                total[metric] += record.get(metric) or 0
+    return totals
+
+
+def diff_reports(report, previous):
+    """Compare the stages and functions of a report with those of a previous one.
+
+    Each stage that ran is compared with its last run before, which may be older
+    than the previous report if the stage was skipped then.
+    """
+    ran = previous.get("last_ran", {})
+    diff = {}
+    for stage in report["stages"]:
+        if stage["status"] != "ran" or stage["name"] not in ran:
+            continue
+        old = ran[stage["name"]]
+        old_totals = _function_totals(old)
+        diff[stage["name"]] = {
+            **_compare(stage, old),
+            "functions": {
+                name: _compare(total, old_totals[name])
+                for name, total in _function_totals(stage).items()
+                if name in old_totals
+            },
+        }
+    return diff
+
+
+def save_report(report, report_file):
+    """Save a run report as JSON, with its diff against the previous report."""
+    previous = {}
+    if os.path.isfile(report_file):
+        with open(report_file) as f:
+            previous = json.load(f)
+    report["previous_run"] = previous.get("started")
+    report["diff"] = diff_reports(report, previous)
+    report["last_ran"] = {
+        **previous.get("last_ran", {}),
+        **{
+            stage["name"]: stage
+            for stage in report["stages"]
+            if stage["status"] == "ran"
+        },
+    }
+    os.makedirs(os.path.dirname(report_file) or ".", exist_ok=True)
+    with open(report_file, "w") as f:
+        json.dump(report, f, indent=1)
+    return report
+
+
+def _format(value, fmt):
+    return "-" if value is None else fmt.format(value)
+
+
+def print_report(report):
+    """Print a summary table of a report, with the change in wall time.
+
+    The CPU time includes the process pools of a stage, whose largest process
+    is given as "pool MB".  When the stages ran in the same process, their
+    peak RSS is that of the whole run so far, and is marked with a *.
+    """
+    cumulative = report.get("in_process", False)
+    print(
+        "{:<10} {:>8} {:>8} {:>8} {:>8} {:>8} {:>12} {:>12} {:>9}".format(
+            "stage",
+            "status",
+            "wall s",
+            "CPU s",
+            "RSS MB*" if cumulative else "RSS MB",
+            "pool MB*" if cumulative else "pool MB",
+            "rows in",
+            "rows out",
+            "vs prev",
+        )
+    )
+    for stage in report["stages"]:
+        rows = [(stage["name"], stage)] + [
+            ("  " + name, total) for name, total in _function_totals(stage).items()
+        ]
+        for i, (name, record) in enumerate(rows):
+            diff = report["diff"].get(stage["name"], {})
+            if i:
+                diff = diff.get("functions", {}).get(name.strip(), {})
+            change = diff.get("wall_s", {}).get("change")
+            print(
+                "{:<10} {:>8} {:>8} {:>8} {:>8} {:>8} {:>12} {:>12} {:>9}".format(
+                    name,
+                    stage["status"] if not i else "",
+                    _format(record.get("wall_s"), "{:.1f}"),
+                    _format(record.get("cpu_s"), "{:.1f}"),
+                    _format(record.get("peak_rss_mb"), "{:.0f}"),
+                    _format(record.get("pool_rss_mb"), "{:.0f}"),
+                    _format(record.get("rows_in"), "{:,d}"),
+                    _format(record.get("rows_out"), "{:,d}"),
+                    _format(change, "{:+.0%}"),
+                )
+            )
+    if cumulative:
+        print("* peak of the whole run so far, as the stages ran in one process")
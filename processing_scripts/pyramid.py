@@ -0,0 +1,72 @@
+import pandas as pd, numpy as np
+from . import intermediates
+
+# The underway time series is downsampled into tiers of fixed time bins, from the
+# finest to the coarsest, each holding these statistics of each variable in every
+# bin (labelled by its start in date_time).  Bins without any data are left out
+PYRAMID_TIERS = ["1min", "10min", "1h"]
+STATISTICS = ["mean", "std", "min", "max", "count"]
+PYRAMID_FILE = "data/processing/optode/A21_uws_pyramid_{}.csv"
+
+
+def downsample(df, columns, freq):
+    """Compute the statistics of `columns` in time bins of `freq`."""
+    bins = df.groupby(df["date_time"].dt.floor(freq))[columns]
+    tier = bins.agg(STATISTICS)
+    tier.columns = ["{}_{}".format(column, stat) for column, stat in tier.columns]
+    return tier.rename_axis("date_time").reset_index()
+
+
+def coarsen(tier, columns, freq):
+    """Combine the bins of a tier into coarser bins of `freq`.
+
+    Gives the same statistics as downsampling the original data, without
+    going through it again.
+    """
+    key = tier["date_time"].dt.floor(freq)
+    bins = tier.groupby(key)
+    coarse = pd.DataFrame(index=bins.size().index)
+    for column in columns:
+        n = tier[column + "_count"]
+        mean = tier[column + "_mean"]
+        count = bins[column + "_count"].sum()
+        coarse[column + "_mean"] = (n * mean.fillna(0)).groupby(key).sum() / count
+        # Pooled sum of squared deviations from the mean of the coarse bin
+        deviation = mean - coarse[column + "_mean"].reindex(key).to_numpy()
+        squares = (n - 1).clip(lower=0) * tier[column + "_std"].fillna(0) ** 2
+        squares += n * deviation.fillna(0) ** 2
+        coarse[column + "_std"] = np.sqrt(
+            squares.groupby(key).sum() / (count - 1).where(count > 1)
+        )
+        coarse[column + "_min"] = bins[column + "_min"].min()
+        coarse[column + "_max"] = bins[column + "_max"].max()
+        coarse[column + "_count"] = count
+    return coarse.rename_axis("date_time").reset_index()
+
+
+def build_pyramid(df, columns, tiers=PYRAMID_TIERS):
+    """Downsample `columns` of a time series into each tier, in a dict.
+
+    Only the finest tier is computed from `df`, each coarser one from the
+    previous tier.
+    """
+    pyramid = {tiers[0]: downsample(df, columns, tiers[0])}
+    for finer, freq in zip(tiers, tiers[1:]):
+        pyramid[freq] = coarsen(pyramid[finer], columns, freq)
+    return pyramid
+
+
+def pyramid_tier(resolution, tiers=PYRAMID_TIERS):
+    """Return the coarsest tier with bins no longer than `resolution`."""
+    resolution = pd.Timedelta(resolution)
+    fitting = [freq for freq in tiers if pd.Timedelta(freq) <= resolution]
+    if not fitting:
+        raise ValueError(
+            "No tier is as fine as {}: use the full-resolution data".format(resolution)
+        )
+    return max(fitting, key=pd.Timedelta)
+
+
+def read_pyramid(resolution, path=PYRAMID_FILE):
+    """Read the coarsest tier of the pyramid that resolves `resolution`."""
+    return intermediates.read_intermediate(path.format(pyramid_tier(resolution)))
@@ -1,69 +1,88 @@
 import pandas as pd, numpy as np
 from scipy.interpolate import PchipInterpolator
+from .profiling import profiled
+
+# The SBE45 salinity is corrected by half the jump at each switch between the
+# pumps of the SMB, subtracted for the pumps with -1 and added for those with +1
+PUMP_SIGNS = {"SMB_A": -1, "SMB_B": 1}
+
+# Number of salinity values averaged on each side of a pump switch
+SWITCH_ROWS = 10
+
+
+def pump_segments(df, n=SWITCH_ROWS):
+    """Split the data into runs of the same pump (smb_name), in one table.
+
+    Each segment has its pump, first and last row positions (start, stop),
+    start date_time, number of rows, the mean salinity of its first and last
+    `n` rows (head_mean, tail_mean) and the salinity offset at its start, i.e.
+    half the jump from the tail_mean of the previous segment (NaN for the
+    first segment).
+    """
+    # Runs are found on the codes of the pump names, so that NaN is one run too
+    codes = pd.factorize(df["smb_name"])[0]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    stops = np.r_[starts[1:], len(df)]
+    run = np.repeat(np.arange(len(starts)), stops - starts)
+
+    # Position of each row from the start and from the end of its segment
+    position = np.arange(len(df))
+    sal = df["SBE45_sal"].reset_index(drop=True)
+    head_mean = sal.where(position - starts[run] < n).groupby(run).mean()
+    tail_mean = sal.where(stops[run] - position <= n).groupby(run).mean()
+
+    segments = pd.DataFrame(
+        {
+            "smb_name": df["smb_name"].iloc[starts].to_numpy(),
+            "start": starts,
+            "stop": stops,
+            "date_time": df["date_time"].iloc[starts].to_numpy(),
+            "rows": stops - starts,
+            "head_mean": head_mean.to_numpy(),
+            "tail_mean": tail_mean.to_numpy(),
+        }
+    )
+    segments["offset"] = (
+        segments["tail_mean"].shift() - segments["head_mean"]
+    ).abs() / 2
+    return segments
 
 
-def salinity(data):
+@profiled
+def salinity(data, signs=PUMP_SIGNS):
     df = data.copy()
 
-    # Find index where pump name changes
-    change_loc = np.where(np.roll(df["smb_name"], 1) != df["smb_name"])[0].tolist()
-
-    # Add start and end points to list
-    end = df.index[-1]
-    change_loc.append(end)
-
-    # Create df to hold computed differences
-    points = pd.DataFrame({"location": change_loc})
-    points["point"] = np.nan
-    points["date_time"] = np.nan
-
-    for i in range(1, len(change_loc) - 1):
-        first = df["SBE45_sal"][change_loc[i - 1] : change_loc[i]].iloc[-10:].mean()
-        last = df["SBE45_sal"][change_loc[i] : change_loc[i + 1]].iloc[:10].mean()
-        points.loc[points.location == change_loc[i], "point"] = abs(first - last) / 2
-        points.loc[points.location == change_loc[i], "date_time"] = df["date_time"][
-            change_loc[i]
-        ]
-        print("loop {}: {}, {}".format(i, first, last))
+    # Check that datetime colums are datetime objects
+    df["date_time"] = pd.to_datetime(df["date_time"])
 
-    # Drop start and end points
-    points.dropna(axis=0, how="any", inplace=True)
+    # Salinity offset at each pump switch
+    segments = pump_segments(df)
+    print(
+        "{} pumps, {} pump switches".format(
+            segments["smb_name"].nunique(), len(segments) - 1
+        )
+    )
 
     # Drop differences during storm for now
-    L = points["point"] < 1
-    points = points[L]
-
-    # Check that datetime colums are datetime objects
-    df["date_time"] = pd.to_datetime(df["date_time"])
-    points["date_time"] = pd.to_datetime(points["date_time"])
+    points = segments[segments["offset"] < 1]
 
     # PCHIP difference points over date_time range in df
-    points.sort_values(by=["point"], ascending=True)
     interp_obj = PchipInterpolator(
-        points["date_time"], points["point"], extrapolate=False
+        points["date_time"], points["offset"], extrapolate=False
     )
     df["pchip_salinity"] = interp_obj(df["date_time"])
 
     # Replace end nan with last pchip value
     # This is because can only interpolate in between points, not outside
-    df["pchip_salinity"].fillna(method="ffill", inplace=True)
+    df["pchip_salinity"] = df["pchip_salinity"].ffill()
 
     # Replace start nan with first mean point
-    df["pchip_salinity"].fillna(0.404055, inplace=True)
-
-    df["salinity"] = np.nan
-
-    # Add corrected salinity value to df as a function of pump name
-    pump_name = df["smb_name"].unique().tolist()
-    for name in pump_name:
-        if name == "SMB_A":
-            df.loc[df["smb_name"] == "SMB_A", "salinity"] = (
-                df["SBE45_sal"] - df["pchip_salinity"]
-            )
-        else:
-            df.loc[df["smb_name"] == "SMB_B", "salinity"] = (
-                df["SBE45_sal"] + df["pchip_salinity"]
-            )
+    df["pchip_salinity"] = df["pchip_salinity"].fillna(0.404055)
+
+    # Add corrected salinity value to df as a function of pump name (NaN for
+    # pumps without a sign), as floats since smb_name may be categorical
+    sign = df["smb_name"].map(signs).astype(float)
+    df["salinity"] = df["SBE45_sal"] + sign * df["pchip_salinity"]
 
     # === Quality control
     # Add flag
@@ -0,0 +1,108 @@
+import pandas as pd, numpy as np
+
+# Matching of the records of one instrument (the reference, e.g. the optode or
+# the underway bottles) to the nearest records in time of others (e.g. the SMB,
+# QuAAtro DIC or SAMI), on sorted int64 times with np.searchsorted, so that it
+# costs O((n + m) log m) whatever the number of rows
+
+_NAT = np.iinfo(np.int64).min
+
+
+def to_ns(times):
+    """Return times as int64 nanoseconds since 1970, with NaT as the int64 minimum."""
+    times = pd.to_datetime(pd.Series(times)).astype("datetime64[ns]")
+    return times.to_numpy().view(np.int64)
+
+
+def nearest_rows(reference, times, tolerance=None, ties="earlier", assume_sorted=False):
+    """Find the position in `times` nearest to each of the `reference` times.
+
+    Both are int64 ns arrays (see to_ns), `times` need not be sorted.  Returns
+    the positions (-1 where nothing is within `tolerance`, a Timedelta) and the
+    signed distances in ns (other minus reference).  When two records are
+    equally far, `ties` chooses the "earlier" (like pd.merge_asof) or the
+    "later" one (like reindex(method="nearest")).  Of records with the same
+    time, the last one is used.
+
+    With `assume_sorted`, `times` must already be sorted and free of NaT, and
+    are only searched, not copied (e.g. a memory-mapped column stays on disk
+    but for the records it needs).
+    """
+    if ties not in ("earlier", "later"):
+        raise ValueError("ties must be 'earlier' or 'later', not {!r}".format(ties))
+    rows = np.full(len(reference), -1, dtype=np.int64)
+    distance = np.zeros(len(reference), dtype=np.int64)
+    if assume_sorted:
+        order = None
+        sorted_times = times
+    else:
+        valid = np.flatnonzero(times != _NAT)
+        order = valid[np.argsort(times[valid], kind="stable")]
+        sorted_times = times[order]
+    if not len(sorted_times):
+        return rows, distance
+
+    # Last record at or before, and first record after each reference time
+    after = np.searchsorted(sorted_times, reference, side="right")
+    before = np.clip(after - 1, 0, None)
+    after = np.clip(after, None, len(sorted_times) - 1)
+    to_before = np.abs(reference - sorted_times[before])
+    to_after = np.abs(sorted_times[after] - reference)
+    if ties == "earlier":
+        nearest = np.where(to_before <= to_after, before, after)
+    else:
+        nearest = np.where(to_after <= to_before, after, before)
+        # Exact matches stay with the record at the same time
+        nearest = np.where(to_before == 0, before, nearest)
+
+    found = reference != _NAT
+    distance[found] = sorted_times[nearest[found]] - reference[found]
+    if tolerance is not None:
+        found &= np.abs(distance) <= pd.Timedelta(tolerance).value
+    rows[found] = nearest[found] if order is None else order[nearest[found]]
+    distance[~found] = 0
+    return rows, distance
+
+
+def match_nearest(
+    reference,
+    other,
+    columns,
+    tolerance=None,
+    on="date_time",
+    other_on=None,
+    ties="earlier",
+    distance=None,
+):
+    """Return `columns` of `other` at its records nearest in time to `reference`.
+
+    The result has the index of `reference`, with NaN where no record of
+    `other` is within `tolerance`.  If `distance` is a column name, the time
+    distance (other minus reference) of each match is added as a Timedelta.
+    """
+    rows, ns = nearest_rows(
+        to_ns(reference[on]), to_ns(other[other_on or on]), tolerance, ties
+    )
+    # reindex fills the unmatched rows (-1) with NaN, keeping categoricals
+    matched = other[list(columns)].reset_index(drop=True).reindex(rows)
+    matched.index = reference.index
+    if distance is not None:
+        matched[distance] = pd.to_timedelta(np.where(rows >= 0, ns, _NAT))
+    return matched
+
+
+def align(reference, others, on="date_time"):
+    """Match several instruments to a reference one.
+
+    `others` maps the name of each instrument to a tuple of its DataFrame, the
+    columns to match and the tolerance (a Timedelta or None).  Returns a copy of
+    `reference` with the matched columns and a "<name>_distance" column for
+    each instrument.
+    """
+    df = reference.copy()
+    for name, (other, columns, tolerance) in others.items():
+        matched = match_nearest(
+            reference, other, columns, tolerance, on, distance=name + "_distance"
+        )
+        df = pd.concat([df, matched], axis=1)
+    return df